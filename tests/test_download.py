@@ -0,0 +1,127 @@
+import hashlib
+import re
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from tools.utils import download_util
+
+_DATA = bytes(range(256)) * 400
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: '_Server'
+
+    def log_message(self, format: str, *args):
+        pass
+
+    def do_HEAD(self):
+        self.send_response(200)
+        if self.server.accept_ranges:
+            self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(len(_DATA)))
+        self.end_headers()
+
+    def do_GET(self):
+        range_header = self.headers.get('Range', None)
+        self.server.ranges.append(range_header)
+        match = re.fullmatch(r'bytes=(\d+)-(\d*)', range_header or '')
+        if not self.server.honor_ranges or match is None:
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(_DATA)))
+            self.end_headers()
+            self.wfile.write(_DATA)
+            return
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) != '' else len(_DATA) - 1
+        if start >= len(_DATA):
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{len(_DATA)}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(206)
+        self.send_header('Content-Range', f'bytes {start}-{end}/{len(_DATA)}')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+        self.wfile.write(_DATA[start:end + 1])
+
+
+class _Server(ThreadingHTTPServer):
+    accept_ranges: bool
+    honor_ranges: bool
+    ranges: list[str | None]
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _Handler)
+        self.accept_ranges = True
+        self.honor_ranges = True
+        self.ranges = []
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}/font.zip'
+
+
+@pytest.fixture
+def server(monkeypatch: pytest.MonkeyPatch) -> Iterator[_Server]:
+    monkeypatch.setattr(download_util, '_PARALLEL_MIN_SIZE', 1024)
+    server = _Server()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def _sha256() -> str:
+    return hashlib.sha256(_DATA).hexdigest()
+
+
+def test_resume_partial_file(server: _Server, tmp_path: Path):
+    file_path = tmp_path.joinpath('font.zip')
+    tmp_path.joinpath('font.zip.download').write_bytes(_DATA[:1000])
+    download_util.download_file(server.url, file_path, _sha256(), jobs=1)
+    assert file_path.read_bytes() == _DATA
+    assert server.ranges == ['bytes=1000-']
+
+
+def test_parallel_ranges(server: _Server, tmp_path: Path):
+    file_path = tmp_path.joinpath('font.zip')
+    download_util.download_file(server.url, file_path, _sha256(), jobs=4)
+    assert file_path.read_bytes() == _DATA
+    assert sorted(server.ranges) == sorted(['bytes=0-25599', 'bytes=25600-51199', 'bytes=51200-76799', 'bytes=76800-102399'])
+    assert [path.name for path in tmp_path.iterdir()] == ['font.zip']
+
+
+def test_parallel_ranges_discard_over_length_part(server: _Server, tmp_path: Path):
+    file_path = tmp_path.joinpath('font.zip')
+    tmp_path.joinpath('font.zip.download.part0-25599').write_bytes(b'\0' * 30000)
+    tmp_path.joinpath('font.zip.download.part25600-51199').write_bytes(_DATA[25600:26000])
+    download_util.download_file(server.url, file_path, _sha256(), jobs=4)
+    assert file_path.read_bytes() == _DATA
+    assert 'bytes=0-25599' in server.ranges
+    assert 'bytes=26000-51199' in server.ranges
+    assert [path.name for path in tmp_path.iterdir()] == ['font.zip']
+
+
+@pytest.mark.parametrize('accept_ranges', [False, True])
+def test_server_without_range_support(server: _Server, tmp_path: Path, accept_ranges: bool):
+    server.accept_ranges = accept_ranges
+    server.honor_ranges = False
+    file_path = tmp_path.joinpath('font.zip')
+    tmp_path.joinpath('font.zip.download').write_bytes(b'\0' * 1000)
+    download_util.download_file(server.url, file_path, _sha256(), jobs=4)
+    assert file_path.read_bytes() == _DATA
+    assert [path.name for path in tmp_path.iterdir()] == ['font.zip']
+
+
+def test_sha256_mismatch(server: _Server, tmp_path: Path):
+    file_path = tmp_path.joinpath('font.zip')
+    with pytest.raises(Exception, match='Checksum mismatch'):
+        download_util.download_file(server.url, file_path, '0' * 64, jobs=4)
+    assert list(tmp_path.iterdir()) == []
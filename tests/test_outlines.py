@@ -0,0 +1,121 @@
+import random
+from io import BytesIO
+
+import pytest
+from pixel_font_builder import FontBuilder, Glyph, opentype
+
+from tools.utils import outlines_util
+from tools.utils.outlines_util import BitmaskOutlinesPainter
+
+_FONT_SIZE = 8
+
+
+def _parse_bitmap(text: str) -> list[list[int]]:
+    return [[1 if c == '#' else 0 for c in line] for line in text.strip().splitlines()]
+
+
+def _create_random_bitmap(seed: int, density: float) -> list[list[int]]:
+    rng = random.Random(seed)
+    return [[1 if rng.random() < density else 0 for _ in range(_FONT_SIZE)] for _ in range(_FONT_SIZE)]
+
+
+_BITMAPS = {
+    'empty': [[0] * _FONT_SIZE for _ in range(_FONT_SIZE)],
+    'full': [[1] * _FONT_SIZE for _ in range(_FONT_SIZE)],
+    'dot': _parse_bitmap('''
+........
+........
+........
+...#....
+........
+........
+........
+........
+'''),
+    'ring': _parse_bitmap('''
+........
+.######.
+.#....#.
+.#.##.#.
+.#.##.#.
+.#....#.
+.######.
+........
+'''),
+    'diagonal': _parse_bitmap('''
+#.......
+.#......
+..#.....
+...#....
+....#...
+.....#..
+......#.
+.......#
+'''),
+    'checker': _parse_bitmap('''
+#.#.#.#.
+.#.#.#.#
+#.#.#.#.
+.#.#.#.#
+#.#.#.#.
+.#.#.#.#
+#.#.#.#.
+.#.#.#.#
+'''),
+    'pinch': _parse_bitmap('''
+........
+.##.....
+.##.....
+...##...
+...##...
+.##..##.
+.##..##.
+........
+'''),
+    'spiral': _parse_bitmap('''
+########
+.......#
+######.#
+#....#.#
+#.##.#.#
+#.#..#.#
+#.####.#
+#......#
+'''),
+    **{f'random-{seed}': _create_random_bitmap(seed, density) for seed, density in enumerate([0.3, 0.5, 0.5, 0.7, 0.7, 0.9] * 8)},
+}
+
+
+def _compile_font(opentype_format: str, outlines_painter: opentype.OutlinesPainter) -> bytes:
+    builder = FontBuilder()
+    builder.font_metric.font_size = _FONT_SIZE
+    builder.font_metric.horizontal_layout.ascent = _FONT_SIZE
+    builder.font_metric.horizontal_layout.descent = 0
+    builder.meta_info.family_name = 'Outlines Test'
+    builder.glyphs.append(Glyph(
+        name='.notdef',
+        advance_width=_FONT_SIZE,
+        advance_height=_FONT_SIZE,
+        bitmap=_BITMAPS['full'],
+    ))
+    for index, (name, bitmap) in enumerate(_BITMAPS.items()):
+        builder.glyphs.append(Glyph(
+            name=name,
+            advance_width=_FONT_SIZE,
+            advance_height=_FONT_SIZE,
+            bitmap=bitmap,
+        ))
+        builder.character_mapping[0x4E00 + index] = name
+    builder.opentype_config.outlines_painter = outlines_painter
+    buffer = BytesIO()
+    opentype.create_font_builder(builder, opentype_format == 'ttf').save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize('opentype_format', ['otf', 'ttf'])
+def test_bitmask_outlines_match_solid_outlines(opentype_format: str):
+    expected_font_outlines = outlines_util.get_font_outlines(_compile_font(opentype_format, opentype.SolidOutlinesPainter()))
+    actual_font_outlines = outlines_util.get_font_outlines(_compile_font(opentype_format, BitmaskOutlinesPainter()))
+    assert actual_font_outlines.keys() == expected_font_outlines.keys()
+    for glyph_name, expected_outlines in expected_font_outlines.items():
+        assert actual_font_outlines[glyph_name] == expected_outlines, glyph_name
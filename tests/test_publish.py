@@ -0,0 +1,62 @@
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from tools.configs import path_define
+from tools.services import publish_service
+
+_FONT_SIZES = [10, 12, 16]
+_WIDTH_MODES = ['monospaced', 'proportional']
+_FONT_FORMATS = ['otf', 'otf.woff2', 'ttf', 'bdf']
+
+
+@pytest.fixture
+def build_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(path_define, 'outputs_dir', tmp_path.joinpath('outputs'))
+    monkeypatch.setattr(path_define, 'releases_dir', tmp_path.joinpath('releases'))
+    path_define.outputs_dir.mkdir(parents=True)
+    for font_size in _FONT_SIZES:
+        for width_mode in _WIDTH_MODES:
+            for font_format in _FONT_FORMATS:
+                data = f'{font_size}-{width_mode}-{font_format}\n'.encode('utf-8') * (font_size * 100)
+                path_define.outputs_dir.joinpath(f'ark-pixel-inherited-{font_size}px-{width_mode}.{font_format}').write_bytes(data)
+    return tmp_path
+
+
+def test_release_bundles_are_valid_zips(build_dir: Path):
+    file_paths = publish_service.make_release_bundles(_FONT_SIZES, _WIDTH_MODES, _FONT_FORMATS)
+    assert len(file_paths) == len(_FONT_SIZES) + 1
+    for file_path in file_paths:
+        with zipfile.ZipFile(file_path) as file:
+            assert file.testzip() is None
+
+
+def test_release_bundles_extract_to_outputs(build_dir: Path):
+    for file_path in publish_service.make_release_bundles(_FONT_SIZES, _WIDTH_MODES, _FONT_FORMATS):
+        extract_dir = build_dir.joinpath('extract', file_path.stem)
+        with zipfile.ZipFile(file_path) as file:
+            file.extractall(extract_dir)
+        for extracted_file_path in extract_dir.iterdir():
+            if extracted_file_path.name == 'OFL.txt':
+                source_file_path = path_define.project_root_dir.joinpath('LICENSE-OFL')
+            else:
+                source_file_path = path_define.outputs_dir.joinpath(extracted_file_path.name)
+            assert extracted_file_path.read_bytes() == source_file_path.read_bytes()
+
+
+def test_release_bundles_are_reproducible(build_dir: Path):
+    datas = [file_path.read_bytes() for file_path in publish_service.make_release_bundles(_FONT_SIZES, _WIDTH_MODES, _FONT_FORMATS)]
+    for file_path in path_define.releases_dir.iterdir():
+        file_path.unlink()
+    assert [file_path.read_bytes() for file_path in publish_service.make_release_bundles(_FONT_SIZES, _WIDTH_MODES, _FONT_FORMATS)] == datas
+
+
+def test_release_checksums_only_list_current_files(build_dir: Path):
+    file_paths = [publish_service.make_release_zip(font_size, width_mode, font_format) for font_size in _FONT_SIZES for width_mode in _WIDTH_MODES for font_format in _FONT_FORMATS]
+    file_paths.extend(publish_service.make_release_bundles(_FONT_SIZES, _WIDTH_MODES, _FONT_FORMATS))
+    path_define.releases_dir.joinpath('ark-pixel-font-inherited-10px-monospaced-otf-v2000.01.01.zip').write_bytes(b'stale')
+
+    checksums_file_path = publish_service.make_release_checksums(_FONT_SIZES, _WIDTH_MODES, _FONT_FORMATS, True)
+    lines = checksums_file_path.read_text('utf-8').splitlines()
+    assert sorted(line.split('  ')[1] for line in lines) == sorted(file_path.name for file_path in file_paths)
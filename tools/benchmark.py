@@ -0,0 +1,47 @@
+from pathlib import Path
+
+from cyclopts import App, Parameter
+
+from tools.configs import path_define, options
+from tools.configs.options import FontSize
+
+app = App(default_parameter=Parameter(consume_multiple=True))
+
+
+@app.default
+def main(
+        font_sizes: set[FontSize] | None = None,
+        glyph_count: int = 2000,
+        repeat: int = 3,
+        seed: int = 0,
+        output: Path = path_define.build_dir.joinpath('benchmark.json'),
+        baseline: Path | None = None,
+        threshold: float = 0.2,
+        skip_startup: bool = False,
+        enforce_startup_budgets: bool = True,
+):
+    if font_sizes is None:
+        font_sizes = options.font_sizes
+    else:
+        font_sizes = sorted(font_sizes, key=lambda x: options.font_sizes.index(x))
+
+    from tools.services import benchmark_service
+
+    if not skip_startup:
+        benchmark_service.check_startup_time(enforce_budgets=enforce_startup_budgets)
+
+    results = benchmark_service.run_stage_benchmarks(font_sizes, glyph_count, repeat, seed)
+    benchmark_service.save_stage_results(output, results, {
+        'font_sizes': font_sizes,
+        'glyph_count': glyph_count,
+        'repeat': repeat,
+        'seed': seed,
+    })
+    if baseline is not None:
+        regressions = benchmark_service.compare_stage_results(benchmark_service.load_stage_results(baseline), results, threshold)
+        if len(regressions) > 0:
+            raise Exception(f'stages over threshold: {', '.join(regressions)}')
+
+
+if __name__ == '__main__':
+    app()
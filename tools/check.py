@@ -0,0 +1,10 @@
+from tools.services import setup_service, check_service
+
+
+def main():
+    setup_service.setup_ark_pixel()
+    check_service.check_outlines()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,27 +1,27 @@
 import shutil
+import sys
+from pathlib import Path
 from typing import Literal
 
-from cyclopts import App, Parameter
-from loguru import logger
-
 from tools import configs
 from tools.configs import path_define, options
-from tools.configs.options import FontSize, WidthMode, FontFormat, Attachment
-from tools.services import setup_service, font_service, publish_service, info_service, template_service, image_service
-
-app = App(
-    version=configs.version,
-    default_parameter=Parameter(consume_multiple=True),
-)
+from tools.configs.options import FontSize, WidthMode, FontFormat, Attachment, OutlinesEngine
 
 
-@app.default
 def main(
         cleanup: bool = False,
         font_sizes: set[FontSize] | None = None,
         width_modes: set[WidthMode] | None = None,
         font_formats: set[FontFormat] | None = None,
         attachments: set[Attachment | Literal['all']] | None = None,
+        outlines_engine: OutlinesEngine = 'solid',
+        jobs: int = 1,
+        streaming: bool = False,
+        alphabet_asset: bool = False,
+        release_bundles: bool = False,
+        trace: Path | None = None,
+        subsets: list[str] | None = None,
+        webfonts: bool = False,
 ):
     if font_sizes is None:
         font_sizes = options.font_sizes
@@ -41,13 +41,24 @@ def main(
         attachments = options.attachments
     else:
         attachments = sorted(attachments, key=lambda x: options.attachments.index(x))
-    all_font_sizes = font_sizes == options.font_sizes
+
+    from loguru import logger
+
+    from tools.services import setup_service, build_service
 
     logger.info('cleanup = {}', cleanup)
     logger.info('font_sizes = {}', font_sizes)
     logger.info('width_modes = {}', width_modes)
     logger.info('font_formats = {}', font_formats)
     logger.info('attachments = {}', attachments)
+    logger.info('outlines_engine = {}', outlines_engine)
+    logger.info('jobs = {}', jobs)
+    logger.info('streaming = {}', streaming)
+    logger.info('alphabet_asset = {}', alphabet_asset)
+    logger.info('release_bundles = {}', release_bundles)
+    logger.info('trace = {}', trace)
+    logger.info('subsets = {}', subsets)
+    logger.info('webfonts = {}', webfonts)
 
     if cleanup and path_define.build_dir.exists():
         shutil.rmtree(path_define.build_dir)
@@ -55,42 +66,19 @@ def main(
 
     setup_service.setup_ark_pixel()
 
-    design_contexts = font_service.load_design_contexts(font_sizes)
-    for design_context in design_contexts.values():
-        for width_mode in width_modes:
-            design_context.make_fonts(width_mode, font_formats)
-
-    if 'release' in attachments:
-        for font_size in font_sizes:
-            for width_mode in width_modes:
-                publish_service.make_release_zips(font_size, width_mode, font_formats)
-
-    if 'info' in attachments:
-        for font_size in font_sizes:
-            design_context = design_contexts[font_size]
-            for width_mode in width_modes:
-                info_service.make_info(design_context, width_mode)
-
-    if 'alphabet' in attachments:
-        for font_size in font_sizes:
-            design_context = design_contexts[font_size]
-            for width_mode in width_modes:
-                info_service.make_alphabet_txt(design_context, width_mode)
-
-    if 'html' in attachments:
-        for font_size in font_sizes:
-            design_context = design_contexts[font_size]
-            for width_mode in width_modes:
-                template_service.make_alphabet_html(design_context, width_mode)
-            template_service.make_demo_html(design_context)
-        if all_font_sizes:
-            template_service.make_index_html()
-            template_service.make_playground_html()
-
-    if 'image' in attachments:
-        for font_size in font_sizes:
-            image_service.make_preview_image(font_size)
+    build_service.make_all(font_sizes, width_modes, font_formats, attachments, outlines_engine, jobs, streaming, alphabet_asset, release_bundles, trace, subsets, webfonts)
 
 
 if __name__ == '__main__':
-    app()
+    if sys.argv[1:] == ['--version']:
+        print(configs.version)
+    else:
+        from cyclopts import App, Parameter
+
+        app = App(
+            version=configs.version,
+            version_format='plaintext',
+            default_parameter=Parameter(consume_multiple=True),
+        )
+        app.default(main)
+        app()
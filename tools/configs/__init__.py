@@ -1,19 +1,32 @@
-from pixel_font_knife import glyph_mapping_util
-from pixel_font_knife.kerning_util import KerningConfig
+from typing import Any
 
 from tools.configs import path_define, options
-from tools.configs.font import FontConfig
 
 version = '2026.01.04'
 
-font_configs = {font_size: FontConfig.load(font_size) for font_size in options.font_sizes}
-
-mappings = [
-    glyph_mapping_util.load_mapping(path_define.mappings_dir.joinpath('2700-27BF Dingbats.yml')),
-    glyph_mapping_util.load_mapping(path_define.mappings_dir.joinpath('2E80-2EFF CJK Radicals Supplement.yml')),
-    glyph_mapping_util.load_mapping(path_define.mappings_dir.joinpath('2F00-2FDF Kangxi Radicals.yml')),
-    glyph_mapping_util.load_mapping(path_define.mappings_dir.joinpath('1F100-1F1FF Enclosed Alphanumeric Supplement.yml')),
-    glyph_mapping_util.load_mapping(path_define.mappings_dir.joinpath('Inherited.yml')),
+mapping_file_paths = [
+    path_define.mappings_dir.joinpath('2700-27BF Dingbats.yml'),
+    path_define.mappings_dir.joinpath('2E80-2EFF CJK Radicals Supplement.yml'),
+    path_define.mappings_dir.joinpath('2F00-2FDF Kangxi Radicals.yml'),
+    path_define.mappings_dir.joinpath('1F100-1F1FF Enclosed Alphanumeric Supplement.yml'),
+    path_define.mappings_dir.joinpath('Inherited.yml'),
 ]
 
-kerning_config = KerningConfig.load(path_define.kernings_dir.joinpath('default.yml'))
+
+def __getattr__(name: str) -> Any:
+    match name:
+        case 'font_configs':
+            from tools.configs.font import FontConfig
+            value = {font_size: FontConfig.load(font_size) for font_size in options.font_sizes}
+        case 'kerning_config':
+            from pixel_font_knife.kerning_util import KerningConfig
+            value = KerningConfig.load(path_define.kernings_dir.joinpath('default.yml'))
+        case _:
+            raise AttributeError(f'module {repr(__name__)} has no attribute {repr(name)}')
+    globals()[name] = value
+    return value
+
+
+def invalidate(*names: str):
+    for name in names:
+        globals().pop(name, None)
@@ -44,3 +44,9 @@ type Attachment = Literal[
     'image',
 ]
 attachments = list[Attachment](get_args(Attachment.__value__))
+
+type OutlinesEngine = Literal[
+    'solid',
+    'bitmask',
+]
+outlines_engines = list[OutlinesEngine](get_args(OutlinesEngine.__value__))
@@ -11,9 +11,12 @@ templates_dir = assets_dir.joinpath('templates')
 cache_dir = project_root_dir.joinpath('cache')
 downloads_dir = cache_dir.joinpath('downloads')
 ark_pixel_glyphs_dir = cache_dir.joinpath('ark-pixel-glyphs')
+ark_pixel_snapshots_dir = cache_dir.joinpath('ark-pixel-snapshots')
+jinja_cache_dir = cache_dir.joinpath('jinja')
 
 build_dir = project_root_dir.joinpath('build')
 outputs_dir = build_dir.joinpath('outputs')
+subsets_dir = build_dir.joinpath('subsets')
 releases_dir = build_dir.joinpath('releases')
 
 docs_dir = project_root_dir.joinpath('docs')
@@ -0,0 +1,18 @@
+import sys
+from pathlib import Path
+
+from cyclopts import App
+
+from tools.services import coverage_service
+
+app = App()
+
+
+@app.default
+def main(old_outputs_dir: Path, new_outputs_dir: Path):
+    changed = coverage_service.diff_coverage_reports(old_outputs_dir, new_outputs_dir)
+    sys.exit(1 if changed else 0)
+
+
+if __name__ == '__main__':
+    app()
@@ -0,0 +1,42 @@
+from pathlib import Path
+
+from cyclopts import App, Parameter
+
+from tools.configs import path_define, options
+from tools.configs.options import FontSize, WidthMode
+
+app = App(default_parameter=Parameter(consume_multiple=True))
+
+
+@app.default
+def main(
+        texts_file: Path,
+        font_sizes: set[FontSize] | None = None,
+        width_modes: set[WidthMode] | None = None,
+        scale: int = 1,
+        sheet: bool = False,
+        outputs_dir: Path = path_define.outputs_dir.joinpath('samples'),
+):
+    if font_sizes is None:
+        font_sizes = options.font_sizes
+    else:
+        font_sizes = sorted(font_sizes, key=lambda x: options.font_sizes.index(x))
+    if width_modes is None:
+        width_modes = options.width_modes
+    else:
+        width_modes = sorted(width_modes, key=lambda x: options.width_modes.index(x))
+    texts = [text for text in texts_file.read_text('utf-8').splitlines() if text != '']
+
+    from tools.services import setup_service, image_service
+    from tools.services.font_service import DesignContext
+
+    setup_service.setup_ark_pixel()
+
+    for font_size in font_sizes:
+        design_context = DesignContext.load(font_size)
+        for width_mode in width_modes:
+            image_service.make_sample_images(design_context, width_mode, texts, outputs_dir, scale, sheet)
+
+
+if __name__ == '__main__':
+    app()
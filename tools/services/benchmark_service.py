@@ -0,0 +1,200 @@
+import itertools
+import json
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+from pixel_font_knife import glyph_file_util
+from pixel_font_knife.mono_bitmap import MonoBitmap
+
+from tools import configs
+from tools.configs import path_define, options
+from tools.configs.options import FontSize
+from tools.services import font_service, mapping_service, kerning_service, info_service, template_service, image_service
+from tools.services.font_service import DesignContext
+
+_RESULTS_FORMAT_VERSION = 1
+_REGRESSION_MIN_DELTA = 0.001
+
+_STARTUP_BUDGETS = [
+    (['-m', 'tools.cli', '--version'], 0.15),
+    (['-m', 'tools.cli', '--help'], 0.35),
+    (['-c', 'import tools.docs'], 0.15),
+    (['-c', 'import tools.format'], 0.3),
+]
+
+
+def _measure_command(args: list[str], repeat: int) -> float:
+    elapsed_times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=path_define.project_root_dir, stdout=subprocess.DEVNULL, check=True)
+        elapsed_times.append(time.perf_counter() - start_time)
+    return min(elapsed_times)
+
+
+def check_startup_time(repeat: int = 5, enforce_budgets: bool = True):
+    interpreter_time = _measure_command(['-c', 'pass'], repeat)
+    logger.info('Interpreter startup: {:.0f} ms', interpreter_time * 1000)
+    failures = []
+    for args, budget in _STARTUP_BUDGETS:
+        command = ' '.join(args)
+        startup_time = _measure_command(args, repeat) - interpreter_time
+        logger.info("Startup '{}': {:.0f} ms (budget {:.0f} ms)", command, startup_time * 1000, budget * 1000)
+        if startup_time > budget:
+            logger.warning("Startup over budget: '{}'", command)
+            failures.append(command)
+    if enforce_budgets and len(failures) > 0:
+        raise Exception(f'startup over budget: {', '.join(failures)}')
+
+
+def _create_synthetic_glyphs(glyphs_dir: Path, font_size: FontSize, glyph_count: int, seed: int):
+    rng = random.Random(f'{seed}-{font_size}')
+    narrow_code_points = sorted({code_point for alphabet in configs.kerning_config.groups.values() for code_point in map(ord, alphabet) if code_point < 0x2E80} | set(range(0x20, 0x7F)))
+    wide_code_points = range(0x4E00, 0x4E00 + glyph_count)
+    font_config = configs.font_configs[font_size]
+
+    def save_glyph(file_path: Path, width: int, height: int, blank: bool = False):
+        bitmap = MonoBitmap.create(width, height)
+        if not blank:
+            for bitmap_row in bitmap:
+                for x in range(width):
+                    bitmap_row[x] = 1 if rng.random() < 0.35 else 0
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        bitmap.save_png(file_path)
+
+    for code_point in wide_code_points:
+        save_glyph(glyphs_dir.joinpath('common', f'{code_point:04X}.png'), font_size, font_size)
+    for width_mode in options.width_modes:
+        height = font_size if width_mode == 'monospaced' else font_config.layout_metrics[width_mode].line_height
+        save_glyph(glyphs_dir.joinpath(width_mode, 'notdef.png'), font_size // 2, height)
+        for code_point in narrow_code_points:
+            width = font_size // 2 if width_mode == 'monospaced' else rng.randint(3, font_size // 2 + 1)
+            save_glyph(glyphs_dir.joinpath(width_mode, f'{code_point:04X}.png'), width, height, code_point == 0x20)
+
+
+@contextmanager
+def _use_synthetic_workspace(workspace_dir: Path) -> Iterator[None]:
+    names = ['cache_dir', 'ark_pixel_glyphs_dir', 'ark_pixel_snapshots_dir', 'jinja_cache_dir', 'outputs_dir']
+    original_values = {name: getattr(path_define, name) for name in names}
+    path_define.cache_dir = workspace_dir.joinpath('cache')
+    path_define.ark_pixel_glyphs_dir = path_define.cache_dir.joinpath('ark-pixel-glyphs')
+    path_define.ark_pixel_snapshots_dir = path_define.cache_dir.joinpath('ark-pixel-snapshots')
+    path_define.jinja_cache_dir = path_define.cache_dir.joinpath('jinja')
+    path_define.outputs_dir = workspace_dir.joinpath('outputs')
+    try:
+        yield
+    finally:
+        for name, value in original_values.items():
+            setattr(path_define, name, value)
+
+
+def _measure_stage(results: dict[str, float], name: str, func: Callable[..., Any], repeat: int, setup: Callable[[], tuple[Any, ...]] | None = None) -> Any:
+    elapsed_times = []
+    result = None
+    for _ in range(repeat):
+        args = () if setup is None else setup()
+        start_time = time.perf_counter()
+        result = func(*args)
+        elapsed_times.append(time.perf_counter() - start_time)
+    results[name] = min(elapsed_times)
+    logger.info("Stage '{}': {:.1f} ms", name, results[name] * 1000)
+    return result
+
+
+def run_stage_benchmarks(
+        font_sizes: list[FontSize],
+        glyph_count: int = 2000,
+        repeat: int = 3,
+        seed: int = 0,
+) -> dict[str, float]:
+    results = {}
+    with tempfile.TemporaryDirectory() as workspace_dir, _use_synthetic_workspace(Path(workspace_dir)):
+        path_define.cache_dir.mkdir(parents=True)
+        path_define.cache_dir.joinpath('ark-pixel-version.json').write_text(json.dumps({'sha': f'synthetic-{seed}-{glyph_count}'}), 'utf-8')
+        for font_size in font_sizes:
+            glyphs_dir = path_define.ark_pixel_glyphs_dir.joinpath(str(font_size))
+            _create_synthetic_glyphs(glyphs_dir, font_size, glyph_count, seed)
+
+            def load_contexts() -> tuple[list[dict[int, Any]]]:
+                return [glyph_file_util.load_context(glyphs_dir.joinpath(width_mode_dir_name)) for width_mode_dir_name in itertools.chain(['common'], options.width_modes)],
+
+            def apply_mapping_index(contexts: list[dict[int, Any]]):
+                mapping_index = mapping_service.load_mapping_index()
+                for context in contexts:
+                    mapping_service.apply_mapping_index(context, mapping_index)
+
+            def clear_snapshots() -> tuple[FontSize]:
+                shutil.rmtree(path_define.ark_pixel_snapshots_dir, ignore_errors=True)
+                return font_size,
+
+            _measure_stage(results, f'{font_size}px:glyphs', load_contexts, repeat)
+            _measure_stage(results, f'{font_size}px:mapping', apply_mapping_index, repeat, load_contexts)
+            _measure_stage(results, f'{font_size}px:load', DesignContext.load, repeat, clear_snapshots)
+            design_context = _measure_stage(results, f'{font_size}px:load-snapshot', DesignContext.load, repeat, lambda: (font_size,))
+            kerning_values_list = _measure_stage(results, f'{font_size}px:kerning', lambda: [kerning_service.calculate_kerning_values(*template) for template in design_context.get_kerning_templates()], repeat)
+            kerning_values = design_context.save_kerning_values(*kerning_values_list)
+
+            for width_mode in options.width_modes:
+                builder = _measure_stage(results, f'{font_size}px:builder:{width_mode}', design_context.create_builder, repeat, lambda: (width_mode, 'solid', kerning_values))
+                opentype_datas = {}
+                for font_format in options.font_formats:
+                    opentype_format = font_service.get_opentype_format(font_format)
+                    if opentype_format is None:
+                        _measure_stage(results, f'{font_size}px:font:{width_mode}:{font_format}', font_service.save_bitmap_font, repeat, lambda: (builder, font_size, width_mode, font_format))
+                    else:
+                        if opentype_format not in opentype_datas:
+                            opentype_datas[opentype_format] = _measure_stage(results, f'{font_size}px:compile:{width_mode}:{opentype_format}', font_service.compile_opentype_font, repeat, lambda: (builder, opentype_format))
+                        _measure_stage(results, f'{font_size}px:font:{width_mode}:{font_format}', font_service.save_opentype_font, repeat, lambda: (opentype_datas[opentype_format], font_size, width_mode, font_format))
+                _measure_stage(results, f'{font_size}px:info:{width_mode}', info_service.make_info, repeat, lambda: (design_context, width_mode))
+
+            _measure_stage(results, f'{font_size}px:demo-html', template_service.make_demo_html, repeat, lambda: (design_context,))
+            _measure_stage(results, f'{font_size}px:preview-image', image_service.make_preview_image, repeat, lambda: (design_context,))
+    return results
+
+
+def _get_commit_sha() -> str | None:
+    result = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=path_define.project_root_dir, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip()
+
+
+def save_stage_results(file_path: Path, results: dict[str, float], params: dict[str, Any]):
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        'format': _RESULTS_FORMAT_VERSION,
+        'commit': _get_commit_sha(),
+        'params': params,
+        'stages': results,
+    }
+    file_path.write_text(f'{json.dumps(data, indent=2, ensure_ascii=False)}\n', 'utf-8')
+    logger.info("Make benchmark results: '{}'", file_path)
+
+
+def load_stage_results(file_path: Path) -> dict[str, float]:
+    data = json.loads(file_path.read_bytes())
+    if data.get('format') != _RESULTS_FORMAT_VERSION:
+        raise Exception(f"Unsupported benchmark results format: '{file_path}'")
+    return data['stages']
+
+
+def compare_stage_results(baseline_results: dict[str, float], results: dict[str, float], threshold: float = 0.2) -> list[str]:
+    regressions = []
+    for name, elapsed_time in results.items():
+        baseline_time = baseline_results.get(name, None)
+        if baseline_time is None or baseline_time <= 0:
+            continue
+        change = elapsed_time / baseline_time - 1
+        logger.info("Stage '{}': {:.1f} ms -> {:.1f} ms ({:+.1%})", name, baseline_time * 1000, elapsed_time * 1000, change)
+        if change > threshold and elapsed_time - baseline_time > _REGRESSION_MIN_DELTA:
+            regressions.append(name)
+    return regressions
@@ -0,0 +1,395 @@
+import json
+from collections.abc import Callable, Hashable
+from contextlib import AbstractContextManager, nullcontext
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+from pixel_font_builder import FontBuilder
+
+from tools import configs
+from tools.configs import path_define, options
+from tools.configs.options import FontSize, WidthMode, FontFormat, Attachment, OutlinesEngine
+from tools.services import font_service, coverage_service, kerning_service, publish_service, info_service, template_service, image_service, subset_service, webfont_service
+from tools.services.font_service import DesignContext
+from tools.utils import hash_util, memory_util
+from tools.utils.task_util import TaskGraph, TaskRef
+from tools.utils.trace_util import Tracer, TraceSpan
+
+
+def _get_target_name(key: Hashable) -> str:
+    if isinstance(key, tuple):
+        return ':'.join(str(token) for token in key)
+    return str(key)
+
+
+def _get_stage_name(key: Hashable) -> str:
+    if isinstance(key, tuple):
+        return str(key[0])
+    return str(key)
+
+
+class MemoryReport:
+    title: str
+    high_water_marks: dict[str, int | None]
+
+    def __init__(self, title: str):
+        self.title = title
+        self.high_water_marks = {}
+
+    def record(self, key: Hashable, span: TraceSpan):
+        stage_name = _get_stage_name(key)
+        high_water_mark = self.high_water_marks.get(stage_name, None)
+        if high_water_mark is None or (span.peak_memory is not None and span.peak_memory > high_water_mark):
+            high_water_mark = span.peak_memory
+        self.high_water_marks[stage_name] = high_water_mark
+
+    def log(self):
+        for stage_name, high_water_mark in self.high_water_marks.items():
+            logger.info('Memory high-water mark: {} {} = {}', self.title, stage_name, memory_util.format_memory_size(high_water_mark))
+
+
+class BuildManifest:
+    @staticmethod
+    def load() -> BuildManifest:
+        file_path = path_define.build_dir.joinpath('manifest.json')
+        if file_path.is_file():
+            targets = json.loads(file_path.read_bytes())['targets']
+        else:
+            targets = {}
+        return BuildManifest(targets)
+
+    targets: dict[str, dict[str, Any]]
+    _pending_fingerprints: dict[str, str]
+
+    def __init__(self, targets: dict[str, dict[str, Any]]):
+        self.targets = targets
+        self._pending_fingerprints = {}
+
+    def is_up_to_date(self, key: Hashable, fingerprint: str) -> bool:
+        name = _get_target_name(key)
+        target = self.targets.get(name, None)
+        if target is not None and target['fingerprint'] == fingerprint and all(path_define.project_root_dir.joinpath(file_path).is_file() for file_path in target['files']):
+            for file_path in target['files']:
+                logger.info("Up to date: '{}'", path_define.project_root_dir.joinpath(file_path))
+            return True
+        self._pending_fingerprints[name] = fingerprint
+        return False
+
+    def get_fingerprint(self, key: Hashable) -> str | None:
+        name = _get_target_name(key)
+        if name in self._pending_fingerprints:
+            return self._pending_fingerprints[name]
+        if name in self.targets:
+            return self.targets[name]['fingerprint']
+        return None
+
+    def record(self, key: Hashable, result: Any):
+        name = _get_target_name(key)
+        if name not in self._pending_fingerprints:
+            return
+        file_paths = result if isinstance(result, list) else [result]
+        self.targets[name] = {
+            'fingerprint': self._pending_fingerprints.pop(name),
+            'files': [file_path.relative_to(path_define.project_root_dir).as_posix() for file_path in file_paths],
+        }
+
+    def save(self):
+        path_define.build_dir.mkdir(parents=True, exist_ok=True)
+        file_path = path_define.build_dir.joinpath('manifest.json')
+        file_path.write_text(f'{json.dumps({'targets': dict(sorted(self.targets.items()))}, indent=2, ensure_ascii=False)}\n', 'utf-8')
+
+
+def _get_templates_values() -> list[object]:
+    values = []
+    for file_path in sorted(path_define.templates_dir.rglob('*')):
+        if file_path.is_file():
+            values.append(file_path.relative_to(path_define.templates_dir).as_posix())
+            values.append(file_path)
+    return values
+
+
+def _get_font_configs_values() -> list[object]:
+    return [path_define.configs_dir.joinpath(f'font-{font_size}px.yml') for font_size in options.font_sizes]
+
+
+def _get_font_fingerprint(design_context: DesignContext, width_mode: WidthMode, font_format: FontFormat, outlines_engine: OutlinesEngine) -> str:
+    values = [
+        'font',
+        font_format,
+        outlines_engine if font_service.get_opentype_format(font_format) is not None else None,
+        configs.version,
+        metadata.version('pixel-font-builder'),
+        design_context.get_glyphs_hash(width_mode),
+        path_define.configs_dir.joinpath(f'font-{design_context.font_size}px.yml'),
+    ]
+    if width_mode == 'proportional':
+        values.append(path_define.kernings_dir.joinpath('default.yml'))
+    return hash_util.hash_values(values)
+
+
+def _get_alphabet_values(design_context: DesignContext, width_mode: WidthMode) -> list[object]:
+    return [width_mode, ''.join(sorted(design_context.get_alphabet(width_mode)))]
+
+
+def create_task_graph(
+        design_contexts: dict[FontSize, DesignContext],
+        width_modes: list[WidthMode],
+        font_formats: list[FontFormat],
+        attachments: list[Attachment],
+        outlines_engine: OutlinesEngine,
+        manifest: BuildManifest,
+        index_pages: bool,
+        alphabet_asset: bool = False,
+        bundle_font_sizes: list[FontSize] | None = None,
+        subset_alphabets: dict[str, frozenset[str]] | None = None,
+        webfonts: bool = False,
+) -> TaskGraph:
+    graph = TaskGraph()
+
+    def add_target(key: Hashable, fingerprint: str, func: Any, *args: Any, after: list[Hashable] | None = None) -> bool:
+        if manifest.is_up_to_date(key, fingerprint):
+            return False
+        graph.add(key, func, *args, after=[] if after is None else [dependency for dependency in after if dependency in graph])
+        return True
+
+    html_values = [configs.version, webfonts, *_get_font_configs_values(), *_get_templates_values()]
+
+    kerning_values_by_size = {}
+    needs_coverage_tables = False
+
+    def get_kerning_values(design_context: DesignContext) -> dict[tuple[str, str], int] | TaskRef:
+        if design_context.font_size not in kerning_values_by_size:
+            kerning_values = design_context.get_cached_kerning_values()
+            if kerning_values is None:
+                kerning_refs = [graph.add(('kerning', design_context.font_size, index), kerning_service.calculate_kerning_values, *template) for index, template in enumerate(design_context.get_kerning_templates())]
+                kerning_values = graph.add(('kerning', design_context.font_size), DesignContext.save_kerning_values, design_context, *kerning_refs)
+            kerning_values_by_size[design_context.font_size] = kerning_values
+        return kerning_values_by_size[design_context.font_size]
+
+    def add_fonts(design_context: DesignContext, width_mode: WidthMode, subset_name: str | None = None, alphabet: frozenset[str] | None = None):
+        font_size = design_context.font_size
+        key_suffix = () if subset_name is None else (subset_name,)
+        dirty_font_formats = []
+        for font_format in font_formats:
+            fingerprint = _get_font_fingerprint(design_context, width_mode, font_format, outlines_engine)
+            if subset_name is not None:
+                fingerprint = hash_util.hash_values(['subset', subset_name, ''.join(sorted(alphabet)), fingerprint])
+            if not manifest.is_up_to_date(('font', font_size, width_mode, font_format, *key_suffix), fingerprint):
+                dirty_font_formats.append(font_format)
+        if len(dirty_font_formats) == 0:
+            return
+
+        kerning_values = get_kerning_values(design_context) if width_mode == 'proportional' else None
+        builder_ref = graph.add(('builder', font_size, width_mode, *key_suffix), DesignContext.create_builder, design_context, width_mode, outlines_engine, kerning_values, alphabet)
+        for font_format in dirty_font_formats:
+            opentype_format = font_service.get_opentype_format(font_format)
+            if opentype_format is None:
+                graph.add(('font', font_size, width_mode, font_format, *key_suffix), font_service.save_bitmap_font, builder_ref, font_size, width_mode, font_format, subset_name)
+            else:
+                opentype_key = opentype_format, font_size, width_mode, *key_suffix
+                if opentype_key not in graph:
+                    graph.add(opentype_key, font_service.compile_opentype_font, builder_ref, opentype_format)
+                graph.add(('font', font_size, width_mode, font_format, *key_suffix), font_service.save_opentype_font, TaskRef(opentype_key), font_size, width_mode, font_format, subset_name)
+
+    for font_size, design_context in design_contexts.items():
+        for width_mode in width_modes:
+            add_fonts(design_context, width_mode)
+            if subset_alphabets is not None:
+                for subset_name, alphabet in subset_alphabets.items():
+                    add_fonts(design_context, width_mode, subset_name, alphabet)
+            if webfonts:
+                fingerprint = hash_util.hash_values([
+                    'webfont',
+                    metadata.version('fonttools'),
+                    _get_font_fingerprint(design_context, width_mode, 'otf.woff2', outlines_engine),
+                ])
+                add_target(('webfont', font_size, width_mode), fingerprint, webfont_service.make_webfont, design_context, width_mode, outlines_engine, get_kerning_values(design_context) if width_mode == 'proportional' else None)
+
+        if 'release' in attachments:
+            for width_mode in width_modes:
+                for font_format in font_formats:
+                    fingerprint = hash_util.hash_values([
+                        'release',
+                        configs.version,
+                        manifest.get_fingerprint(('font', font_size, width_mode, font_format)),
+                        path_define.project_root_dir.joinpath('LICENSE-OFL'),
+                    ])
+                    add_target(('release', font_size, width_mode, font_format), fingerprint, publish_service.make_release_zip, font_size, width_mode, font_format, after=[('font', font_size, width_mode, font_format)])
+
+        if 'info' in attachments:
+            for width_mode in width_modes:
+                fingerprint = hash_util.hash_values([
+                    'info',
+                    configs.version,
+                    metadata.version('unicodedata2'),
+                    metadata.version('unidata-blocks'),
+                    metadata.version('character-encoding-utils'),
+                    *_get_alphabet_values(design_context, width_mode),
+                ])
+                needs_coverage_tables |= add_target(('info', font_size, width_mode), fingerprint, info_service.make_info, design_context, width_mode)
+                needs_coverage_tables |= add_target(('coverage', font_size, width_mode), hash_util.hash_values(['coverage', fingerprint]), coverage_service.make_coverage_report, design_context, width_mode)
+
+        if 'alphabet' in attachments:
+            for width_mode in width_modes:
+                fingerprint = hash_util.hash_values([
+                    'alphabet',
+                    *_get_alphabet_values(design_context, width_mode),
+                ])
+                add_target(('alphabet', font_size, width_mode), fingerprint, info_service.make_alphabet_txt, design_context, width_mode)
+
+        if 'html' in attachments:
+            for width_mode in width_modes:
+                fingerprint = hash_util.hash_values([
+                    'alphabet-html',
+                    alphabet_asset,
+                    *html_values,
+                    *_get_alphabet_values(design_context, width_mode),
+                ])
+                add_target(('alphabet-html', font_size, width_mode), fingerprint, template_service.make_alphabet_html, design_context, width_mode, alphabet_asset, webfonts)
+            fingerprint = hash_util.hash_values([
+                'demo-html',
+                *html_values,
+                *_get_alphabet_values(design_context, 'monospaced'),
+                *_get_alphabet_values(design_context, 'proportional'),
+            ])
+            add_target(('demo-html', font_size), fingerprint, template_service.make_demo_html, design_context, webfonts)
+
+        if 'image' in attachments:
+            fingerprint = hash_util.hash_values([
+                'image',
+                design_context.get_glyphs_hash('proportional'),
+                path_define.configs_dir.joinpath(f'font-{font_size}px.yml'),
+                path_define.kernings_dir.joinpath('default.yml'),
+            ])
+            add_target(('image', font_size), fingerprint, image_service.make_preview_image, design_context, after=[('kerning', font_size)])
+
+    if 'release' in attachments and bundle_font_sizes is not None:
+        font_keys = [('font', font_size, width_mode, font_format) for font_size in bundle_font_sizes for width_mode in width_modes for font_format in font_formats]
+        fingerprint = hash_util.hash_values([
+            'release-bundle',
+            configs.version,
+            *bundle_font_sizes,
+            *width_modes,
+            *font_formats,
+            *[manifest.get_fingerprint(font_key) for font_key in font_keys],
+            path_define.project_root_dir.joinpath('LICENSE-OFL'),
+        ])
+        add_target('release-bundle', fingerprint, publish_service.make_release_bundles, bundle_font_sizes, width_modes, font_formats, after=font_keys)
+
+    if 'html' in attachments and index_pages:
+        add_target('index-html', hash_util.hash_values(['index-html', *html_values]), template_service.make_index_html, webfonts)
+        add_target('playground-html', hash_util.hash_values(['playground-html', *html_values]), template_service.make_playground_html, webfonts)
+
+    if needs_coverage_tables:
+        coverage_service.get_coverage_tables()
+
+    return graph
+
+
+def _get_trace_counters(result: Any) -> dict[str, int]:
+    if isinstance(result, DesignContext):
+        return {f'{width_mode}_characters': len(result.get_alphabet(width_mode)) for width_mode in options.width_modes}
+    if isinstance(result, FontBuilder):
+        return {'glyphs': len(result.glyphs)}
+    if isinstance(result, bytes):
+        return {'output_bytes': len(result)}
+    if isinstance(result, dict):
+        return {'kerning_pairs': len(result)}
+    if isinstance(result, Path):
+        result = [result]
+    if isinstance(result, list) and all(isinstance(file_path, Path) for file_path in result):
+        return {'output_bytes': sum(file_path.stat().st_size for file_path in result)}
+    return {}
+
+
+def _create_trace_callback(tracer: Tracer | None, memory_report: MemoryReport | None = None) -> Callable[[Hashable, Any, TraceSpan], None] | None:
+    if tracer is None and memory_report is None:
+        return None
+
+    def on_task_traced(key: Hashable, result: Any, span: TraceSpan):
+        if memory_report is not None:
+            memory_report.record(key, span)
+        if tracer is not None:
+            tracer.add(_get_target_name(key), _get_stage_name(key), span, _get_trace_counters(result))
+
+    return on_task_traced
+
+
+def _trace_span(tracer: Tracer | None, name: str, category: str) -> AbstractContextManager[None]:
+    if tracer is None:
+        return nullcontext()
+    return tracer.span(name, category)
+
+
+def _log_trace_summary(tracer: Tracer):
+    for stage_name, count, wall_time, cpu_time, peak_memory_delta, counters in tracer.get_summary():
+        logger.info(
+            'Trace: {:<16} {:>4} x  wall {:>8.3f} s  cpu {:>8.3f} s  peak +{}  {}',
+            stage_name,
+            count,
+            wall_time,
+            cpu_time,
+            memory_util.format_memory_size(peak_memory_delta),
+            ', '.join(f'{counter_name}={value}' for counter_name, value in counters.items()),
+        )
+
+
+def _run_task_graph(graph: TaskGraph, jobs: int, manifest: BuildManifest, memory_report: MemoryReport, tracer: Tracer | None = None):
+    graph.run(jobs, manifest.record, _create_trace_callback(tracer, memory_report))
+    memory_report.log()
+
+
+def make_all(
+        font_sizes: list[FontSize],
+        width_modes: list[WidthMode],
+        font_formats: list[FontFormat],
+        attachments: list[Attachment],
+        outlines_engine: OutlinesEngine = 'solid',
+        jobs: int = 1,
+        streaming: bool = False,
+        alphabet_asset: bool = False,
+        release_bundles: bool = False,
+        trace_file_path: Path | None = None,
+        subsets: list[str] | None = None,
+        webfonts: bool = False,
+        design_contexts: dict[FontSize, DesignContext] | None = None,
+):
+    assert not streaming or design_contexts is None
+    tracer = None if trace_file_path is None else Tracer()
+    with _trace_span(tracer, 'setup', 'setup'):
+        subset_alphabets = None if subsets is None else subset_service.load_subset_alphabets(subsets)
+        manifest = BuildManifest.load()
+    index_pages = font_sizes == options.font_sizes
+    bundle_font_sizes = font_sizes if release_bundles else None
+    try:
+        if streaming:
+            for font_size in font_sizes:
+                memory_report = MemoryReport(f'{font_size}px')
+                design_contexts = font_service.load_design_contexts([font_size], 1, _create_trace_callback(tracer, memory_report))
+                with _trace_span(tracer, f'plan:{font_size}', 'plan'):
+                    graph = create_task_graph(design_contexts, width_modes, font_formats, attachments, outlines_engine, manifest, False, alphabet_asset, None, subset_alphabets, webfonts)
+                del design_contexts
+                _run_task_graph(graph, jobs, manifest, memory_report, tracer)
+            with _trace_span(tracer, 'plan', 'plan'):
+                graph = create_task_graph({}, width_modes, font_formats, attachments, outlines_engine, manifest, index_pages, alphabet_asset, bundle_font_sizes, None, webfonts)
+            _run_task_graph(graph, jobs, manifest, MemoryReport('all'), tracer)
+        else:
+            memory_report = MemoryReport('all')
+            if design_contexts is None:
+                design_contexts = font_service.load_design_contexts(font_sizes, jobs, _create_trace_callback(tracer, memory_report))
+            with _trace_span(tracer, 'plan', 'plan'):
+                graph = create_task_graph(design_contexts, width_modes, font_formats, attachments, outlines_engine, manifest, index_pages, alphabet_asset, bundle_font_sizes, subset_alphabets, webfonts)
+            del design_contexts
+            _run_task_graph(graph, jobs, manifest, memory_report, tracer)
+        if 'release' in attachments:
+            with _trace_span(tracer, 'checksums', 'checksums'):
+                publish_service.make_release_checksums(font_sizes, width_modes, font_formats, release_bundles)
+    finally:
+        with _trace_span(tracer, 'manifest', 'manifest'):
+            manifest.save()
+        if tracer is not None:
+            tracer.save(trace_file_path)
+            logger.info("Make trace: '{}'", trace_file_path)
+            _log_trace_summary(tracer)
@@ -0,0 +1,155 @@
+import json
+import os
+import pickle
+import tempfile
+import zlib
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+from pixel_font_knife.glyph_file_util import GlyphFlavorGroup
+
+from tools import configs
+from tools.configs import path_define
+from tools.configs.options import FontSize
+from tools.utils import hash_util
+from tools.utils.arena_util import ArenaGlyphFile
+
+_CACHE_FORMAT_VERSION = 1
+_SNAPSHOT_FORMAT_VERSION = 3
+_MAPPING_INDEX_FORMAT_VERSION = 1
+
+
+def _load_cache(file_path: Path, key: str) -> Any | None:
+    if not file_path.is_file():
+        return None
+    data = pickle.loads(zlib.decompress(file_path.read_bytes()))
+    if data.get('format') != _CACHE_FORMAT_VERSION or data['key'] != key:
+        logger.info("Cache outdated: '{}'", file_path)
+        return None
+    logger.info("Load cache: '{}'", file_path)
+    return data['value']
+
+
+def _save_cache(file_path: Path, key: str, value: Any):
+    data = {
+        'format': _CACHE_FORMAT_VERSION,
+        'key': key,
+        'value': value,
+    }
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=file_path.parent, prefix=f'{file_path.name}.', suffix='.tmp', delete=False) as file:
+        file.write(zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL), 1))
+    os.replace(file.name, file_path)
+    logger.info("Save cache: '{}'", file_path)
+
+
+def _get_contexts_snapshot_key(font_size: FontSize) -> str:
+    sha = json.loads(path_define.cache_dir.joinpath('ark-pixel-version.json').read_bytes())['sha']
+    return hash_util.hash_values([
+        _SNAPSHOT_FORMAT_VERSION,
+        font_size,
+        sha,
+        configs.version,
+        metadata.version('pixel-font-knife'),
+    ])
+
+
+def _get_mapping_index_key() -> str:
+    return hash_util.hash_values([
+        _MAPPING_INDEX_FORMAT_VERSION,
+        metadata.version('pixel-font-knife'),
+        *[file_path.name for file_path in configs.mapping_file_paths],
+        *configs.mapping_file_paths,
+    ])
+
+
+def load_mapping_index() -> list[Any] | None:
+    return _load_cache(path_define.ark_pixel_snapshots_dir.joinpath('mappings.bin'), _get_mapping_index_key())
+
+
+def save_mapping_index(mapping_index: list[Any]):
+    _save_cache(path_define.ark_pixel_snapshots_dir.joinpath('mappings.bin'), _get_mapping_index_key(), mapping_index)
+
+
+def load_contexts_snapshot(font_size: FontSize) -> dict[str, dict[int, GlyphFlavorGroup]] | None:
+    snapshot = _load_cache(path_define.ark_pixel_snapshots_dir.joinpath(f'{font_size}px.bin'), _get_contexts_snapshot_key(font_size))
+    if snapshot is None:
+        return None
+
+    glyphs_dir = path_define.ark_pixel_glyphs_dir.joinpath(str(font_size))
+    arena = snapshot['arena']
+    flavors_pool = {}
+    glyph_files = []
+    for glyph_file_path, code_point, flavors, offset, width, height in snapshot['glyph_files']:
+        flavors = flavors_pool.setdefault(flavors, flavors)
+        glyph_files.append(ArenaGlyphFile(str(glyphs_dir.joinpath(glyph_file_path)), code_point, flavors, arena, offset, width, height))
+
+    contexts = {}
+    for context_name, raw_context in snapshot['contexts'].items():
+        context = {}
+        for code_point, raw_flavor_group in raw_context:
+            flavor_group = GlyphFlavorGroup()
+            for flavor, index in raw_flavor_group:
+                flavor_group[flavor] = glyph_files[index]
+            context[code_point] = flavor_group
+        contexts[context_name] = context
+    return contexts
+
+
+def save_contexts_snapshot(font_size: FontSize, contexts: dict[str, dict[int, GlyphFlavorGroup]]):
+    glyphs_dir = path_define.ark_pixel_glyphs_dir.joinpath(str(font_size))
+    glyph_file_indices = {}
+    raw_glyph_files = []
+    arena = bytearray()
+    raw_contexts = {}
+    for context_name, context in contexts.items():
+        raw_context = []
+        for code_point, flavor_group in context.items():
+            raw_flavor_group = []
+            for flavor, glyph_file in flavor_group.items():
+                index = glyph_file_indices.get(glyph_file, None)
+                if index is None:
+                    index = len(raw_glyph_files)
+                    glyph_file_indices[glyph_file] = index
+                    bitmap = glyph_file.bitmap
+                    raw_glyph_files.append((
+                        glyph_file.file_path.relative_to(glyphs_dir).as_posix(),
+                        glyph_file.code_point,
+                        tuple(glyph_file.flavors),
+                        len(arena),
+                        bitmap.width,
+                        bitmap.height,
+                    ))
+                    for bitmap_row in bitmap:
+                        arena.extend(bitmap_row)
+                raw_flavor_group.append((flavor, index))
+            raw_context.append((code_point, raw_flavor_group))
+        raw_contexts[context_name] = raw_context
+
+    snapshot = {
+        'arena': bytes(arena),
+        'glyph_files': raw_glyph_files,
+        'contexts': raw_contexts,
+    }
+    _save_cache(path_define.ark_pixel_snapshots_dir.joinpath(f'{font_size}px.bin'), _get_contexts_snapshot_key(font_size), snapshot)
+
+
+def load_kerning_values(font_size: FontSize, key: str) -> dict[tuple[str, str], int] | None:
+    kerning_values = _load_cache(path_define.ark_pixel_snapshots_dir.joinpath(f'{font_size}px-kerning.bin'), key)
+    if kerning_values is None:
+        return None
+    return dict(kerning_values)
+
+
+def save_kerning_values(font_size: FontSize, key: str, kerning_values: dict[tuple[str, str], int]):
+    _save_cache(path_define.ark_pixel_snapshots_dir.joinpath(f'{font_size}px-kerning.bin'), key, list(kerning_values.items()))
+
+
+def load_coverage_tables(key: str) -> dict[str, Any] | None:
+    return _load_cache(path_define.cache_dir.joinpath('coverage-tables.bin'), key)
+
+
+def save_coverage_tables(key: str, coverage_tables: dict[str, Any]):
+    _save_cache(path_define.cache_dir.joinpath('coverage-tables.bin'), key, coverage_tables)
@@ -0,0 +1,27 @@
+from typing import Literal
+
+from loguru import logger
+
+from tools.configs import options
+from tools.configs.options import WidthMode, OutlinesEngine
+from tools.services.font_service import DesignContext, compile_opentype_font
+from tools.utils import outlines_util
+
+
+def _get_font_outlines(design_context: DesignContext, width_mode: WidthMode, outlines_engine: OutlinesEngine, opentype_format: Literal['otf', 'ttf']) -> dict[str, list[tuple[tuple[float, float], ...]]]:
+    builder = design_context.create_builder(width_mode, outlines_engine, {})
+    return outlines_util.get_font_outlines(compile_opentype_font(builder, opentype_format))
+
+
+def check_outlines():
+    for font_size in options.font_sizes:
+        design_context = DesignContext.load(font_size)
+        for width_mode in options.width_modes:
+            for opentype_format in ('otf', 'ttf'):
+                expected_font_outlines = _get_font_outlines(design_context, width_mode, 'solid', opentype_format)
+                actual_font_outlines = _get_font_outlines(design_context, width_mode, 'bitmask', opentype_format)
+                assert actual_font_outlines.keys() == expected_font_outlines.keys()
+                for glyph_name, expected_outlines in expected_font_outlines.items():
+                    if actual_font_outlines[glyph_name] != expected_outlines:
+                        raise Exception(f"Outlines mismatch: {font_size}px {width_mode} {opentype_format} '{glyph_name}'")
+                logger.info('Check outlines: {}px {} {} ({} glyphs)', font_size, width_mode, opentype_format, len(expected_font_outlines))
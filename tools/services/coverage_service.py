@@ -0,0 +1,264 @@
+import bisect
+import csv
+import functools
+import json
+from collections import Counter
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+from weakref import WeakKeyDictionary
+
+import unicodedata2
+import unidata_blocks
+from character_encoding_utils import gb2312, big5, shiftjis, ksx1001
+from loguru import logger
+
+from tools import configs
+from tools.configs import path_define, options
+from tools.configs.options import WidthMode
+from tools.services import cache_service
+from tools.services.font_service import DesignContext
+from tools.utils import hash_util
+
+_COVERAGE_TABLES_FORMAT_VERSION = 1
+
+
+def _do_we_need_to_create_a_glyph(c: str) -> bool:
+    if c in ('\u0020', '\u3000'):
+        return True
+    category = unicodedata2.category(c)
+    return category.startswith(('L', 'M', 'N', 'P', 'S'))
+
+
+charsets = {
+    'gb2312': gb2312,
+    'big5': big5,
+    'shiftjis': shiftjis,
+    'ksx1001': ksx1001,
+}
+
+_shared_coverages: WeakKeyDictionary[DesignContext, Counter[tuple[str, int | str]]] = WeakKeyDictionary()
+
+
+def clear_caches():
+    _shared_coverages.clear()
+
+
+def _create_coverage_tables() -> dict[str, Any]:
+    block_totals = {}
+    block_ranges = {}
+    for block in unidata_blocks.get_blocks():
+        total = 0
+        ranges = []
+        if 'Private Use Area' not in block.name:
+            for code_point in range(block.code_start, block.code_end + 1):
+                if _do_we_need_to_create_a_glyph(chr(code_point)):
+                    total += 1
+                    if len(ranges) > 0 and ranges[-1][1] == code_point - 1:
+                        ranges[-1] = ranges[-1][0], code_point
+                    else:
+                        ranges.append((code_point, code_point))
+        block_totals[block.code_start] = total
+        block_ranges[block.code_start] = ranges
+
+    candidates = set()
+    for charset in charsets.values():
+        candidates.update(charset.get_alphabet())
+    category_alphabets = {charset_name: {category: set() for category in charset.get_categories()} for charset_name, charset in charsets.items()}
+    for c in candidates:
+        for charset_name, charset in charsets.items():
+            category = charset.query_category(c)
+            if category is not None:
+                category_alphabets[charset_name][category].add(c)
+
+    return {
+        'block_totals': block_totals,
+        'block_ranges': block_ranges,
+        'category_alphabets': {charset_name: {category: frozenset(alphabet) for category, alphabet in alphabets.items()} for charset_name, alphabets in category_alphabets.items()},
+    }
+
+
+@functools.cache
+def get_coverage_tables() -> dict[str, Any]:
+    key = hash_util.hash_values([
+        _COVERAGE_TABLES_FORMAT_VERSION,
+        metadata.version('unicodedata2'),
+        metadata.version('unidata-blocks'),
+        metadata.version('character-encoding-utils'),
+        unicodedata2.unidata_version,
+        unidata_blocks.unicode_version,
+    ])
+    coverage_tables = cache_service.load_coverage_tables(key)
+    if coverage_tables is None:
+        coverage_tables = _create_coverage_tables()
+        cache_service.save_coverage_tables(key, coverage_tables)
+    return coverage_tables
+
+
+def _count_coverage(alphabet: set[str]) -> Counter[tuple[str, int | str]]:
+    coverage = Counter()
+
+    code_points = sorted(ord(c) for c in alphabet)
+    start_index = 0
+    while start_index < len(code_points):
+        block = unidata_blocks.get_block_by_code_point(code_points[start_index])
+        if block is None:
+            raise Exception(f'code point not in any block: 0x{code_points[start_index]:04X}')
+        end_index = bisect.bisect_right(code_points, block.code_end, start_index)
+        if 'Private Use Area' not in block.name:
+            for code_point in code_points[start_index:end_index]:
+                assert _do_we_need_to_create_a_glyph(chr(code_point))
+        coverage['unicode', block.code_start] = end_index - start_index
+        start_index = end_index
+
+    for charset_name, category_alphabets in get_coverage_tables()['category_alphabets'].items():
+        for category, category_alphabet in category_alphabets.items():
+            coverage[charset_name, category] = len(category_alphabet.intersection(alphabet))
+    return coverage
+
+
+def get_coverage(design_context: DesignContext, width_mode: WidthMode) -> Counter[tuple[str, int | str]]:
+    shared_alphabet = set.intersection(*[design_context.get_alphabet(other_width_mode) for other_width_mode in options.width_modes])
+    shared_coverage = _shared_coverages.get(design_context, None)
+    if shared_coverage is None:
+        shared_coverage = _count_coverage(shared_alphabet)
+        _shared_coverages[design_context] = shared_coverage
+    coverage = Counter(shared_coverage)
+    coverage.update(_count_coverage(design_context.get_alphabet(width_mode) - shared_alphabet))
+    return coverage
+
+
+def _to_ranges(code_points: list[int]) -> list[list[int]]:
+    ranges = []
+    for code_point in code_points:
+        if len(ranges) > 0 and ranges[-1][1] == code_point - 1:
+            ranges[-1][1] = code_point
+        else:
+            ranges.append([code_point, code_point])
+    return ranges
+
+
+def _from_ranges(ranges: list[list[int]]) -> set[int]:
+    code_points = set()
+    for code_start, code_end in ranges:
+        code_points.update(range(code_start, code_end + 1))
+    return code_points
+
+
+def _subtract_ranges(ranges: list[tuple[int, int]], code_points: set[int]) -> list[list[int]]:
+    missing_ranges = []
+    for code_start, code_end in ranges:
+        for code_point in range(code_start, code_end + 1):
+            if code_point in code_points:
+                continue
+            if len(missing_ranges) > 0 and missing_ranges[-1][1] == code_point - 1:
+                missing_ranges[-1][1] = code_point
+            else:
+                missing_ranges.append([code_point, code_point])
+    return missing_ranges
+
+
+def create_coverage_report(design_context: DesignContext, width_mode: WidthMode) -> dict[str, Any]:
+    coverage_tables = get_coverage_tables()
+    alphabet = design_context.get_alphabet(width_mode)
+    code_points = {ord(c) for c in alphabet}
+    coverage = get_coverage(design_context, width_mode)
+
+    blocks = []
+    for code_start, count in sorted((code_start, count) for (charset_name, code_start), count in coverage.items() if charset_name == 'unicode' and count > 0):
+        block = unidata_blocks.get_block_by_code_point(code_start)
+        blocks.append({
+            'code_start': block.code_start,
+            'code_end': block.code_end,
+            'name': block.name,
+            'count': count,
+            'total': coverage_tables['block_totals'][code_start],
+            'missing': _subtract_ranges(coverage_tables['block_ranges'][code_start], code_points),
+        })
+
+    charset_infos = []
+    for charset_name, category_alphabets in coverage_tables['category_alphabets'].items():
+        for category, category_alphabet in category_alphabets.items():
+            charset_infos.append({
+                'charset': charset_name,
+                'category': category,
+                'count': coverage[charset_name, category],
+                'total': len(category_alphabet),
+                'missing': _to_ranges(sorted(ord(c) for c in category_alphabet.difference(alphabet))),
+            })
+
+    return {
+        'font_size': design_context.font_size,
+        'width_mode': width_mode,
+        'version': configs.version,
+        'unicode_version': unidata_blocks.unicode_version,
+        'char_count': len(alphabet),
+        'blocks': blocks,
+        'charsets': charset_infos,
+    }
+
+
+def make_coverage_report(design_context: DesignContext, width_mode: WidthMode) -> list[Path]:
+    report = create_coverage_report(design_context, width_mode)
+
+    path_define.outputs_dir.mkdir(parents=True, exist_ok=True)
+    json_file_path = path_define.outputs_dir.joinpath(f'coverage-{design_context.font_size}px-{width_mode}.json')
+    json_file_path.write_text(f'{json.dumps(report, ensure_ascii=False)}\n', 'utf-8')
+    logger.info("Make coverage json: '{}'", json_file_path)
+
+    csv_file_path = path_define.outputs_dir.joinpath(f'coverage-{design_context.font_size}px-{width_mode}.csv')
+    with csv_file_path.open('w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['type', 'name', 'category', 'code_start', 'code_end', 'count', 'total', 'missing'])
+        for block in report['blocks']:
+            writer.writerow(['block', block['name'], '', f'{block['code_start']:04X}', f'{block['code_end']:04X}', block['count'], block['total'], sum(code_end - code_start + 1 for code_start, code_end in block['missing'])])
+        for charset_info in report['charsets']:
+            writer.writerow(['charset', charset_info['charset'], charset_info['category'], '', '', charset_info['count'], charset_info['total'], sum(code_end - code_start + 1 for code_start, code_end in charset_info['missing'])])
+    logger.info("Make coverage csv: '{}'", csv_file_path)
+
+    return [json_file_path, csv_file_path]
+
+
+def _get_report_entries(report: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    entries = {}
+    for block in report['blocks']:
+        entries[f'block {block['code_start']:04X} {block['name']}'] = block
+    for charset_info in report['charsets']:
+        entries[f'charset {charset_info['charset']} {charset_info['category']}'] = charset_info
+    return entries
+
+
+def diff_coverage_reports(old_outputs_dir: Path, new_outputs_dir: Path) -> bool:
+    changed = False
+    for new_file_path in sorted(new_outputs_dir.glob('coverage-*.json')):
+        old_file_path = old_outputs_dir.joinpath(new_file_path.name)
+        if not old_file_path.is_file():
+            logger.info("New report: '{}'", new_file_path.name)
+            changed = True
+            continue
+        old_entries = _get_report_entries(json.loads(old_file_path.read_bytes()))
+        new_entries = _get_report_entries(json.loads(new_file_path.read_bytes()))
+        for name in sorted(old_entries.keys() | new_entries.keys()):
+            old_entry = old_entries.get(name, None)
+            new_entry = new_entries.get(name, None)
+            old_count = 0 if old_entry is None else old_entry['count']
+            new_count = 0 if new_entry is None else new_entry['count']
+            if old_entry is not None and new_entry is not None and old_entry['missing'] == new_entry['missing'] and old_count == new_count:
+                continue
+            changed = True
+            logger.info('{}: {}: {} -> {}', new_file_path.name, name, old_count, new_count)
+            if old_entry is None or new_entry is None:
+                continue
+            old_missing = _from_ranges(old_entry['missing'])
+            new_missing = _from_ranges(new_entry['missing'])
+            added = ''.join(chr(code_point) for code_point in sorted(old_missing - new_missing))
+            if len(added) > 0:
+                logger.info('    + {}', added)
+            removed = ''.join(chr(code_point) for code_point in sorted(new_missing - old_missing))
+            if len(removed) > 0:
+                logger.info('    - {}', removed)
+    for old_file_path in sorted(old_outputs_dir.glob('coverage-*.json')):
+        if not new_outputs_dir.joinpath(old_file_path.name).is_file():
+            logger.info("Removed report: '{}'", old_file_path.name)
+            changed = True
+    return changed
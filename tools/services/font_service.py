@@ -1,50 +1,75 @@
 import itertools
 import math
+from collections import ChainMap
+from collections.abc import Callable, Hashable
 from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Literal
 
+from fontTools.ttLib import TTFont
 from loguru import logger
 from pixel_font_builder import FontBuilder, WeightName, SerifStyle, SlantStyle, WidthStyle, Glyph, opentype
-from pixel_font_knife import glyph_file_util, glyph_mapping_util, kerning_util
-from pixel_font_knife.glyph_file_util import GlyphFlavorGroup
+from pixel_font_knife import glyph_file_util
+from pixel_font_knife.glyph_file_util import GlyphFile, GlyphFlavorGroup
 
 from tools import configs
 from tools.configs import path_define, options
-from tools.configs.options import FontSize, WidthMode, FontFormat
+from tools.configs.options import FontSize, WidthMode, FontFormat, OutlinesEngine
+from tools.services import cache_service, kerning_service, mapping_service
+from tools.utils import hash_util
+from tools.utils.outlines_util import BitmaskOutlinesPainter
+from tools.utils.task_util import TaskGraph
+from tools.utils.trace_util import TraceSpan
 
 
 class DesignContext:
     @staticmethod
-    def load(font_size: FontSize) -> DesignContext:
-        contexts = {}
-        for width_mode_dir_name in itertools.chain(['common'], options.width_modes):
-            context = glyph_file_util.load_context(path_define.ark_pixel_glyphs_dir.joinpath(str(font_size), width_mode_dir_name))
-            for mapping in configs.mappings:
-                glyph_mapping_util.apply_mapping(context, mapping)
-            contexts[width_mode_dir_name] = context
+    def load(font_size: FontSize, mapping_index: list[mapping_service.MappingStage] | None = None) -> DesignContext:
+        source_contexts = cache_service.load_contexts_snapshot(font_size)
+        if source_contexts is None:
+            source_contexts = {}
+            for width_mode_dir_name in itertools.chain(['common'], options.width_modes):
+                source_contexts[width_mode_dir_name] = glyph_file_util.load_context(path_define.ark_pixel_glyphs_dir.joinpath(str(font_size), width_mode_dir_name))
+            cache_service.save_contexts_snapshot(font_size, source_contexts)
+            source_contexts = cache_service.load_contexts_snapshot(font_size)
 
-        glyph_files = {}
-        for width_mode in options.width_modes:
-            glyph_files[width_mode] = dict(contexts['common'])
-            glyph_files[width_mode].update(contexts[width_mode])
+        if mapping_index is None:
+            mapping_index = mapping_service.load_mapping_index()
 
-        return DesignContext(font_size, contexts, glyph_files)
+        return DesignContext(font_size, source_contexts, mapping_index)
 
     font_size: FontSize
+    _source_contexts: dict[str, dict[int, GlyphFlavorGroup]]
     _contexts: dict[str, dict[int, GlyphFlavorGroup]]
-    _glyph_files: dict[WidthMode, dict[int, GlyphFlavorGroup]]
+    _glyph_files: dict[WidthMode, ChainMap[int, GlyphFlavorGroup]]
     _alphabet_cache: dict[str, set[str]]
+    _glyphs_hash_cache: dict[str, str]
     _proportional_kerning_values: dict[tuple[str, str], int] | None
 
     def __init__(
             self,
             font_size: FontSize,
-            contexts: dict[str, dict[int, GlyphFlavorGroup]],
-            glyph_files: dict[WidthMode, dict[int, GlyphFlavorGroup]],
+            source_contexts: dict[str, dict[int, GlyphFlavorGroup]],
+            mapping_index: list[mapping_service.MappingStage],
     ):
         self.font_size = font_size
-        self._contexts = contexts
-        self._glyph_files = glyph_files
+        self._source_contexts = source_contexts
         self._alphabet_cache = {}
+        self._glyphs_hash_cache = {}
+        self._proportional_kerning_values = None
+        self.apply_mapping_index(mapping_index)
+
+    def apply_mapping_index(self, mapping_index: list[mapping_service.MappingStage]):
+        contexts = {}
+        for context_name, source_context in self._source_contexts.items():
+            context = dict(source_context)
+            mapping_service.apply_mapping_index(context, mapping_index)
+            contexts[context_name] = context
+        self._contexts = contexts
+        self._glyph_files = {width_mode: ChainMap(contexts[width_mode], contexts['common']) for width_mode in options.width_modes}
+        self._alphabet_cache.clear()
+        self._glyphs_hash_cache.clear()
         self._proportional_kerning_values = None
 
     def get_alphabet(self, width_mode: WidthMode) -> set[str]:
@@ -55,7 +80,76 @@ class DesignContext:
             self._alphabet_cache[width_mode] = alphabet
         return alphabet
 
-    def _create_builder(self, width_mode: WidthMode) -> FontBuilder:
+    def get_glyph_sequence(self, width_mode: WidthMode) -> list[GlyphFile]:
+        return glyph_file_util.get_glyph_sequence(self._glyph_files[width_mode], ['zh_tr'])
+
+    def get_glyph_file(self, width_mode: WidthMode, code_point: int) -> GlyphFile:
+        glyph_files = self._glyph_files[width_mode]
+        if code_point not in glyph_files:
+            code_point = -1
+        return glyph_files[code_point].get_file('zh_tr')
+
+    def get_horizontal_offset(self, width_mode: WidthMode, glyph_file: GlyphFile) -> tuple[int, int]:
+        layout_metric = configs.font_configs[self.font_size].layout_metrics[width_mode]
+        return 0, layout_metric.baseline - self.font_size - (glyph_file.height - self.font_size) // 2
+
+    def get_glyphs_hash(self, width_mode: WidthMode) -> str:
+        if width_mode in self._glyphs_hash_cache:
+            glyphs_hash = self._glyphs_hash_cache[width_mode]
+        else:
+            values = []
+            for glyph_file in self.get_glyph_sequence(width_mode):
+                values.append(glyph_file.glyph_name)
+                values.append((glyph_file.width, glyph_file.height))
+                values.append(bytes(itertools.chain.from_iterable(glyph_file.bitmap)))
+            values.append(sorted(glyph_file_util.get_character_mapping(self._glyph_files[width_mode], 'zh_tr').items()))
+            glyphs_hash = hash_util.hash_values(values)
+            self._glyphs_hash_cache[width_mode] = glyphs_hash
+        return glyphs_hash
+
+    def _get_kerning_values_key(self) -> str:
+        context = self._contexts['proportional']
+        values = [path_define.kernings_dir.joinpath('default.yml')]
+        for code_point in sorted({ord(c) for alphabet in configs.kerning_config.groups.values() for c in alphabet}):
+            if code_point not in context:
+                continue
+            glyph_file = context[code_point].get_file()
+            values.append(code_point)
+            values.append(glyph_file.glyph_name)
+            values.append((glyph_file.width, glyph_file.height))
+            values.append(bytes(itertools.chain.from_iterable(glyph_file.bitmap)))
+        return hash_util.hash_values(values)
+
+    def get_cached_kerning_values(self) -> dict[tuple[str, str], int] | None:
+        if self._proportional_kerning_values is None:
+            self._proportional_kerning_values = cache_service.load_kerning_values(self.font_size, self._get_kerning_values_key())
+        return self._proportional_kerning_values
+
+    def clear_kerning_values(self):
+        self._proportional_kerning_values = None
+
+    def get_kerning_templates(self) -> list[kerning_service.KerningTemplate]:
+        return kerning_service.get_kerning_templates(configs.kerning_config, self._contexts['proportional'])
+
+    def save_kerning_values(self, *kerning_values_list: dict[tuple[str, str], int]) -> dict[tuple[str, str], int]:
+        kerning_values = kerning_service.merge_kerning_values(kerning_values_list)
+        cache_service.save_kerning_values(self.font_size, self._get_kerning_values_key(), kerning_values)
+        self._proportional_kerning_values = kerning_values
+        return kerning_values
+
+    def get_kerning_values(self) -> dict[tuple[str, str], int]:
+        kerning_values = self.get_cached_kerning_values()
+        if kerning_values is None:
+            kerning_values = self.save_kerning_values(*[kerning_service.calculate_kerning_values(*template) for template in self.get_kerning_templates()])
+        return kerning_values
+
+    def create_builder(
+            self,
+            width_mode: WidthMode,
+            outlines_engine: OutlinesEngine = 'solid',
+            kerning_values: dict[tuple[str, str], int] | None = None,
+            alphabet: set[str] | frozenset[str] | None = None,
+    ) -> FontBuilder:
         layout_metric = configs.font_configs[self.font_size].layout_metrics[width_mode]
 
         builder = FontBuilder()
@@ -88,28 +182,33 @@ class DesignContext:
         builder.meta_info.designer_url = 'https://takwolf.com'
         builder.meta_info.license_url = 'https://github.com/TakWolf/ark-pixel-font-inherited/blob/master/LICENSE-OFL'
 
-        glyph_sequence = glyph_file_util.get_glyph_sequence(self._glyph_files[width_mode], ['zh_tr'])
+        glyph_sequence = self.get_glyph_sequence(width_mode)
+        character_mapping = glyph_file_util.get_character_mapping(self._glyph_files[width_mode], 'zh_tr')
+        if alphabet is not None:
+            character_mapping = {code_point: glyph_name for code_point, glyph_name in character_mapping.items() if chr(code_point) in alphabet}
+            glyph_names = {'.notdef', *character_mapping.values()}
+            glyph_sequence = [glyph_file for glyph_file in glyph_sequence if glyph_file.glyph_name in glyph_names]
+
         for glyph_file in glyph_sequence:
-            horizontal_offset_x = 0
-            horizontal_offset_y = layout_metric.baseline - self.font_size - (glyph_file.height - self.font_size) // 2
             vertical_offset_x = -math.ceil(glyph_file.width / 2)
             vertical_offset_y = (self.font_size - glyph_file.height) // 2 - 1
             builder.glyphs.append(Glyph(
                 name=glyph_file.glyph_name,
-                horizontal_offset=(horizontal_offset_x, horizontal_offset_y),
+                horizontal_offset=self.get_horizontal_offset(width_mode, glyph_file),
                 advance_width=glyph_file.width,
                 vertical_offset=(vertical_offset_x, vertical_offset_y),
                 advance_height=self.font_size,
                 bitmap=glyph_file.bitmap.data,
             ))
 
-        character_mapping = glyph_file_util.get_character_mapping(self._glyph_files[width_mode], 'zh_tr')
         builder.character_mapping.update(character_mapping)
 
         if width_mode == 'proportional':
-            if self._proportional_kerning_values is None:
-                self._proportional_kerning_values = kerning_util.calculate_kerning_values(configs.kerning_config, self._contexts['proportional'])
-            builder.kerning_values.update(self._proportional_kerning_values)
+            if kerning_values is None:
+                kerning_values = self.get_kerning_values()
+            if alphabet is not None:
+                kerning_values = {(left_glyph_name, right_glyph_name): offset for (left_glyph_name, right_glyph_name), offset in kerning_values.items() if left_glyph_name in glyph_names and right_glyph_name in glyph_names}
+            builder.kerning_values.update(kerning_values)
 
         builder.opentype_config.fields_override.head_y_max = layout_metric.ascent
         builder.opentype_config.fields_override.head_y_min = layout_metric.descent
@@ -118,29 +217,68 @@ class DesignContext:
             builder.opentype_config.is_monospaced = True
             builder.opentype_config.fields_override.os2_x_avg_char_width = self.font_size // 2
 
+        if outlines_engine == 'bitmask':
+            builder.opentype_config.outlines_painter = BitmaskOutlinesPainter()
+
         return builder
 
-    def make_fonts(self, width_mode: WidthMode, font_formats: list[FontFormat]):
+
+def get_opentype_format(font_format: FontFormat) -> Literal['otf', 'ttf'] | None:
+    match font_format.split('.')[0]:
+        case 'otf':
+            return 'otf'
+        case 'ttf':
+            return 'ttf'
+        case _:
+            return None
+
+
+def compile_opentype_font(builder: FontBuilder, opentype_format: Literal['otf', 'ttf']) -> bytes:
+    buffer = BytesIO()
+    opentype.create_font_builder(builder, opentype_format == 'ttf').save(buffer)
+    return buffer.getvalue()
+
+
+def _get_font_file_path(font_size: FontSize, width_mode: WidthMode, font_format: FontFormat, subset_name: str | None) -> Path:
+    if subset_name is None:
         path_define.outputs_dir.mkdir(parents=True, exist_ok=True)
+        return path_define.outputs_dir.joinpath(f'ark-pixel-inherited-{font_size}px-{width_mode}.{font_format}')
+    path_define.subsets_dir.mkdir(parents=True, exist_ok=True)
+    return path_define.subsets_dir.joinpath(f'ark-pixel-inherited-{font_size}px-{width_mode}-{subset_name}.{font_format}')
+
+
+def save_opentype_font(data: bytes, font_size: FontSize, width_mode: WidthMode, font_format: FontFormat, subset_name: str | None = None) -> Path:
+    file_path = _get_font_file_path(font_size, width_mode, font_format, subset_name)
+    match font_format:
+        case 'otf.woff' | 'ttf.woff':
+            font = TTFont(BytesIO(data), recalcBBoxes=False, recalcTimestamp=False)
+            font.flavor = opentype.Flavor.WOFF
+            font.save(file_path)
+        case 'otf.woff2' | 'ttf.woff2':
+            font = TTFont(BytesIO(data), recalcBBoxes=False, recalcTimestamp=False)
+            font.flavor = opentype.Flavor.WOFF2
+            font.save(file_path)
+        case _:
+            file_path.write_bytes(data)
+    logger.info("Make font: '{}'", file_path)
+    return file_path
+
+
+def save_bitmap_font(builder: FontBuilder, font_size: FontSize, width_mode: WidthMode, font_format: FontFormat, subset_name: str | None = None) -> Path:
+    file_path = _get_font_file_path(font_size, width_mode, font_format, subset_name)
+    getattr(builder, f'save_{font_format}')(file_path)
+    logger.info("Make font: '{}'", file_path)
+    return file_path
+
 
-        if len(font_formats) > 0:
-            builder = self._create_builder(width_mode)
-            for font_format in font_formats:
-                file_path = path_define.outputs_dir.joinpath(f'ark-pixel-inherited-{self.font_size}px-{width_mode}.{font_format}')
-                match font_format:
-                    case 'otf.woff':
-                        builder.save_otf(file_path, flavor=opentype.Flavor.WOFF)
-                    case 'otf.woff2':
-                        builder.save_otf(file_path, flavor=opentype.Flavor.WOFF2)
-                    case 'ttf.woff':
-                        builder.save_ttf(file_path, flavor=opentype.Flavor.WOFF)
-                    case 'ttf.woff2':
-                        builder.save_ttf(file_path, flavor=opentype.Flavor.WOFF2)
-                    case _:
-                        getattr(builder, f'save_{font_format}')(file_path)
-                logger.info("Make font: '{}'", file_path)
-
-
-def load_design_contexts(font_sizes: list[FontSize]) -> dict[FontSize, DesignContext]:
-    design_contexts = {font_size: DesignContext.load(font_size) for font_size in font_sizes}
+def load_design_contexts(
+        font_sizes: list[FontSize],
+        jobs: int = 1,
+        on_task_traced: Callable[[Hashable, Any, TraceSpan], None] | None = None,
+) -> dict[FontSize, DesignContext]:
+    mapping_index = mapping_service.load_mapping_index()
+    graph = TaskGraph()
+    for font_size in font_sizes:
+        graph.add(('load', font_size), DesignContext.load, font_size, mapping_index)
+    design_contexts = {font_size: design_context for (_, font_size), design_context in graph.run(jobs, on_task_traced=on_task_traced).items()}
     return design_contexts
@@ -1,62 +1,157 @@
-from PIL import Image, ImageFont, ImageDraw
-from PIL.ImageFont import FreeTypeFont
+from pathlib import Path
+
+from PIL import Image
 from loguru import logger
+from pixel_font_knife.glyph_file_util import GlyphFile
 
 from tools import configs
 from tools.configs import path_define
-from tools.configs.options import FontSize, WidthMode
-
-
-def _load_font(font_size: FontSize, width_mode: WidthMode, scale: int = 1) -> FreeTypeFont:
-    file_path = path_define.outputs_dir.joinpath(f'ark-pixel-inherited-{font_size}px-{width_mode}.otf.woff2')
-    return ImageFont.truetype(file_path, font_size * scale)
-
-
-def _draw_text(
-        image: Image.Image,
-        xy: tuple[float, float],
-        text: str,
-        font: FreeTypeFont,
-        text_color: tuple[int, int, int, int] = (0, 0, 0, 255),
-        shadow_color: tuple[int, int, int, int] | None = None,
-        line_height: int | None = None,
-        line_gap: int = 0,
-        is_horizontal_centered: bool = False,
-        is_vertical_centered: bool = False,
-):
-    draw = ImageDraw.Draw(image)
-    x, y = xy
-    default_line_height = sum(font.getmetrics())
-    if line_height is None:
-        line_height = default_line_height
-    y += (line_height - default_line_height) / 2
-    spacing = line_height + line_gap - font.getbbox('A')[3]
-    if is_horizontal_centered:
-        x -= draw.textbbox((0, 0), text, font=font)[2] / 2
-    if is_vertical_centered:
-        y -= line_height / 2
-    if shadow_color is not None:
-        draw.text((x + 1, y + 1), text, fill=shadow_color, font=font, spacing=spacing)
-    draw.text((x, y), text, fill=text_color, font=font, spacing=spacing)
-
-
-def make_preview_image(font_size: FontSize):
-    font = _load_font(font_size, 'proportional')
-    line_height = configs.font_configs[font_size].line_height
-
-    image = Image.new('RGBA', (font_size * 28, font_size * 2 + line_height * 9), (255, 255, 255, 255))
-    _draw_text(image, (font_size, font_size), '方舟像素字体 - 传承字形 / Ark Pixel Font - Inherited', font)
-    _draw_text(image, (font_size, font_size + line_height), '我们度过的每个平凡的日常，也许就是连续发生的奇迹。', font)
-    _draw_text(image, (font_size, font_size + line_height * 2), '我們度過的每個平凡的日常，也許就是連續發生的奇蹟。', font)
-    _draw_text(image, (font_size, font_size + line_height * 3), '日々、私たちが過ごしている日常は、', font)
-    _draw_text(image, (font_size, font_size + line_height * 4), '実は奇跡の連続なのかもしれない。', font)
-    _draw_text(image, (font_size, font_size + line_height * 5), 'THE QUICK BROWN FOX JUMPS OVER A LAZY DOG.', font)
-    _draw_text(image, (font_size, font_size + line_height * 6), 'the quick brown fox jumps over a lazy dog.', font)
-    _draw_text(image, (font_size, font_size + line_height * 7), '0123456789', font)
-    _draw_text(image, (font_size, font_size + line_height * 8), '★☆☺☹♠♡♢♣♤♥♦♧☀☼♩♪♫♬☂☁⚓✈⚔☯', font)
-    image = image.resize((image.width * 2, image.height * 2), Image.Resampling.NEAREST)
+from tools.configs.options import WidthMode
+from tools.configs.font import LayoutMetric
+from tools.services.font_service import DesignContext
+
+
+class BitmapTextRenderer:
+    design_context: DesignContext
+    width_mode: WidthMode
+    scale: int
+    layout_metric: LayoutMetric
+    kerning_values: dict[tuple[str, str], int]
+    _glyph_rasters: dict[int, tuple[str, int, int, Image.Image | None]]
+
+    def __init__(self, design_context: DesignContext, width_mode: WidthMode, scale: int = 1):
+        assert scale >= 1, f'illegal scale: {scale}'
+        self.design_context = design_context
+        self.width_mode = width_mode
+        self.scale = scale
+        self.layout_metric = configs.font_configs[design_context.font_size].layout_metrics[width_mode]
+        self.kerning_values = design_context.get_kerning_values() if width_mode == 'proportional' else {}
+        self._glyph_rasters = {}
+
+    @property
+    def line_height(self) -> int:
+        return self.layout_metric.line_height * self.scale
+
+    def _create_mask(self, glyph_file: GlyphFile) -> Image.Image | None:
+        if glyph_file.width <= 0 or glyph_file.height <= 0:
+            return None
+        mask = Image.frombytes('L', (glyph_file.width, glyph_file.height), bytes(255 if alpha != 0 else 0 for bitmap_row in glyph_file.bitmap for alpha in bitmap_row))
+        if self.scale > 1:
+            mask = mask.resize((glyph_file.width * self.scale, glyph_file.height * self.scale), Image.Resampling.NEAREST)
+        return mask
+
+    def _get_glyph_raster(self, code_point: int) -> tuple[str, int, int, Image.Image | None]:
+        glyph_raster = self._glyph_rasters.get(code_point, None)
+        if glyph_raster is None:
+            glyph_file = self.design_context.get_glyph_file(self.width_mode, code_point)
+            _, offset_y = self.design_context.get_horizontal_offset(self.width_mode, glyph_file)
+            glyph_raster = glyph_file.glyph_name, glyph_file.width, self.layout_metric.ascent - offset_y - glyph_file.height, self._create_mask(glyph_file)
+            self._glyph_rasters[code_point] = glyph_raster
+        return glyph_raster
+
+    def _layout(self, text: str) -> list[tuple[int, int, Image.Image | None]]:
+        layout = []
+        x = 0
+        previous_glyph_name = None
+        for c in text:
+            glyph_name, advance_width, top, mask = self._get_glyph_raster(ord(c))
+            if previous_glyph_name is not None:
+                x += self.kerning_values.get((previous_glyph_name, glyph_name), 0)
+            layout.append((x, top, mask))
+            x += advance_width
+            previous_glyph_name = glyph_name
+        layout.append((x, 0, None))
+        return layout
+
+    def measure_text(self, text: str) -> int:
+        return self._layout(text)[-1][0] * self.scale
+
+    def draw_text(
+            self,
+            image: Image.Image,
+            xy: tuple[int, int],
+            text: str,
+            text_color: tuple[int, int, int, int] = (0, 0, 0, 255),
+    ):
+        x, y = xy
+        for glyph_x, glyph_y, mask in self._layout(text):
+            if mask is not None:
+                image.paste(text_color, (x + glyph_x * self.scale, y + glyph_y * self.scale), mask)
+
+    def render_text(
+            self,
+            text: str,
+            padding: int = 0,
+            text_color: tuple[int, int, int, int] = (0, 0, 0, 255),
+            background_color: tuple[int, int, int, int] = (255, 255, 255, 255),
+    ) -> Image.Image:
+        image = Image.new('RGBA', (self.measure_text(text) + padding * 2, self.line_height + padding * 2), background_color)
+        self.draw_text(image, (padding, padding), text, text_color)
+        return image
+
+    def render_sheet(
+            self,
+            texts: list[str],
+            padding: int = 0,
+            text_color: tuple[int, int, int, int] = (0, 0, 0, 255),
+            background_color: tuple[int, int, int, int] = (255, 255, 255, 255),
+    ) -> Image.Image:
+        width = max((self.measure_text(text) for text in texts), default=0)
+        image = Image.new('RGBA', (width + padding * 2, self.line_height * len(texts) + padding * 2), background_color)
+        for index, text in enumerate(texts):
+            self.draw_text(image, (padding, padding + self.line_height * index), text, text_color)
+        return image
+
+
+def make_preview_image(design_context: DesignContext) -> Path:
+    font_size = design_context.font_size
+    renderer = BitmapTextRenderer(design_context, 'proportional', 2)
+    image = Image.new('RGBA', (font_size * 28 * 2, (font_size * 2 + configs.font_configs[font_size].line_height * 9) * 2), (255, 255, 255, 255))
+    for index, text in enumerate([
+        '方舟像素字体 - 传承字形 / Ark Pixel Font - Inherited',
+        '我们度过的每个平凡的日常，也许就是连续发生的奇迹。',
+        '我們度過的每個平凡的日常，也許就是連續發生的奇蹟。',
+        '日々、私たちが過ごしている日常は、',
+        '実は奇跡の連続なのかもしれない。',
+        'THE QUICK BROWN FOX JUMPS OVER A LAZY DOG.',
+        'the quick brown fox jumps over a lazy dog.',
+        '0123456789',
+        '★☆☺☹♠♡♢♣♤♥♦♧☀☼♩♪♫♬☂☁⚓✈⚔☯',
+    ]):
+        renderer.draw_text(image, (font_size * 2, font_size * 2 + renderer.line_height * index), text)
 
     path_define.outputs_dir.mkdir(parents=True, exist_ok=True)
     file_path = path_define.outputs_dir.joinpath(f'preview-{font_size}px.png')
     image.save(file_path)
     logger.info("Make preview image: '{}'", file_path)
+    return file_path
+
+
+def make_sample_images(
+        design_context: DesignContext,
+        width_mode: WidthMode,
+        texts: list[str],
+        outputs_dir: Path,
+        scale: int = 1,
+        sheet: bool = False,
+) -> list[Path]:
+    renderer = BitmapTextRenderer(design_context, width_mode, scale)
+    padding = design_context.font_size * scale
+    name = f'{design_context.font_size}px-{width_mode}'
+
+    outputs_dir.mkdir(parents=True, exist_ok=True)
+    file_paths = []
+    if sheet:
+        file_path = outputs_dir.joinpath(f'samples-{name}.png')
+        renderer.render_sheet(texts, padding).save(file_path)
+        logger.info("Make sample sheet: '{}'", file_path)
+        file_paths.append(file_path)
+    else:
+        samples_dir = outputs_dir.joinpath(f'samples-{name}')
+        samples_dir.mkdir(exist_ok=True)
+        for index, text in enumerate(texts):
+            file_path = samples_dir.joinpath(f'{index:0{len(str(len(texts)))}}.png')
+            renderer.render_text(text, padding).save(file_path)
+            file_paths.append(file_path)
+        logger.info("Make sample images: '{}' ({})", samples_dir, len(file_paths))
+    return file_paths
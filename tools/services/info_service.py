@@ -1,8 +1,7 @@
-from collections import defaultdict
-from collections.abc import Callable
+from collections import defaultdict, Counter
+from pathlib import Path
 from typing import TextIO
 
-import unicodedata2
 import unidata_blocks
 from character_encoding_utils import gb2312, big5, shiftjis, ksx1001
 from loguru import logger
@@ -11,49 +10,30 @@ from unidata_blocks import UnicodeBlock
 from tools import configs
 from tools.configs import path_define
 from tools.configs.options import WidthMode
+from tools.services import coverage_service
 from tools.services.font_service import DesignContext
 
 
-def _do_we_need_to_create_a_glyph(c: str) -> bool:
-    if c in ('\u0020', '\u3000'):
-        return True
-    category = unicodedata2.category(c)
-    return category.startswith(('L', 'M', 'N', 'P', 'S'))
-
-
-def _get_unicode_chr_count_infos(alphabet: set[str]) -> list[tuple[UnicodeBlock, int, int]]:
-    in_block_counts = defaultdict(int)
-    for c in alphabet:
-        block = unidata_blocks.get_block_by_chr(c)
-        if 'Private Use Area' not in block.name:
-            assert _do_we_need_to_create_a_glyph(c)
-        in_block_counts[block.code_start] += 1
-
+def _get_unicode_chr_count_infos(coverage: Counter[tuple[str, int | str]]) -> list[tuple[UnicodeBlock, int, int]]:
+    block_totals = coverage_service.get_coverage_tables()['block_totals']
     count_infos = []
-    for code_start, count in sorted(in_block_counts.items()):
-        block = unidata_blocks.get_block_by_code_point(code_start)
-        total = 0
-        if 'Private Use Area' not in block.name:
-            for code_point in range(block.code_start, block.code_end + 1):
-                c = chr(code_point)
-                if _do_we_need_to_create_a_glyph(c):
-                    total += 1
-        count_infos.append((block, count, total))
+    for (charset_name, code_start), count in coverage.items():
+        if charset_name == 'unicode' and count > 0:
+            count_infos.append((unidata_blocks.get_block_by_code_point(code_start), count, block_totals[code_start]))
+    count_infos.sort(key=lambda count_info: count_info[0].code_start)
     return count_infos
 
 
-def _get_locale_chr_count_infos(alphabet: set[str], query_category_func: Callable[[str], str | None]) -> defaultdict[str, int]:
+def _get_locale_chr_count_infos(coverage: Counter[tuple[str, int | str]], charset_name: str) -> defaultdict[str, int]:
     count_infos = defaultdict(int)
-    for c in alphabet:
-        category = query_category_func(c)
-        if category is not None:
-            count_infos[category] += 1
-            count_infos['total'] += 1
+    for category in coverage_service.charsets[charset_name].get_categories():
+        count_infos[category] = coverage[charset_name, category]
+        count_infos['total'] += count_infos[category]
     return count_infos
 
 
-def _get_gb2312_chr_count_infos(alphabet: set[str]) -> list[tuple[str, int, int]]:
-    count_infos = _get_locale_chr_count_infos(alphabet, gb2312.query_category)
+def _get_gb2312_chr_count_infos(coverage: Counter[tuple[str, int | str]]) -> list[tuple[str, int, int]]:
+    count_infos = _get_locale_chr_count_infos(coverage, 'gb2312')
     return [
         ('一级汉字', count_infos['level-1'], gb2312.get_level_1_count()),
         ('二级汉字', count_infos['level-2'], gb2312.get_level_2_count()),
@@ -62,8 +42,8 @@ def _get_gb2312_chr_count_infos(alphabet: set[str]) -> list[tuple[str, int, int]
     ]
 
 
-def _get_big5_chr_count_infos(alphabet: set[str]) -> list[tuple[str, int, int]]:
-    count_infos = _get_locale_chr_count_infos(alphabet, big5.query_category)
+def _get_big5_chr_count_infos(coverage: Counter[tuple[str, int | str]]) -> list[tuple[str, int, int]]:
+    count_infos = _get_locale_chr_count_infos(coverage, 'big5')
     return [
         ('常用汉字', count_infos['level-1'], big5.get_level_1_count()),
         ('次常用汉字', count_infos['level-2'], big5.get_level_2_count()),
@@ -72,8 +52,8 @@ def _get_big5_chr_count_infos(alphabet: set[str]) -> list[tuple[str, int, int]]:
     ]
 
 
-def _get_shiftjis_chr_count_infos(alphabet: set[str]) -> list[tuple[str, int, int]]:
-    count_infos = _get_locale_chr_count_infos(alphabet, shiftjis.query_category)
+def _get_shiftjis_chr_count_infos(coverage: Counter[tuple[str, int | str]]) -> list[tuple[str, int, int]]:
+    count_infos = _get_locale_chr_count_infos(coverage, 'shiftjis')
     return [
         ('单字节-ASCII可打印字符', count_infos['single-byte-ascii-printable'], shiftjis.get_single_byte_ascii_printable_count()),
         ('单字节-半角片假名', count_infos['single-byte-half-width-katakana'], shiftjis.get_single_byte_half_width_katakana_count()),
@@ -83,8 +63,8 @@ def _get_shiftjis_chr_count_infos(alphabet: set[str]) -> list[tuple[str, int, in
     ]
 
 
-def _get_ksx1001_chr_count_infos(alphabet: set[str]) -> list[tuple[str, int, int]]:
-    count_infos = _get_locale_chr_count_infos(alphabet, ksx1001.query_category)
+def _get_ksx1001_chr_count_infos(coverage: Counter[tuple[str, int | str]]) -> list[tuple[str, int, int]]:
+    count_infos = _get_locale_chr_count_infos(coverage, 'ksx1001')
     return [
         ('谚文音节', count_infos['syllable'], ksx1001.get_syllable_count()),
         ('汉字', count_infos['hanja'], ksx1001.get_hanja_count()),
@@ -116,8 +96,9 @@ def _write_locale_chr_count_infos_table(file: TextIO, infos: list[tuple[str, int
         file.write(f'| {name} | {count} / {total} | {missing} | {progress:.2%} {finished_emoji} |\n')
 
 
-def make_info(design_context: DesignContext, width_mode: WidthMode):
+def make_info(design_context: DesignContext, width_mode: WidthMode) -> Path:
     alphabet = design_context.get_alphabet(width_mode)
+    coverage = coverage_service.get_coverage(design_context, width_mode)
 
     path_define.outputs_dir.mkdir(parents=True, exist_ok=True)
     file_path = path_define.outputs_dir.joinpath(f'info-{design_context.font_size}px-{width_mode}.md')
@@ -135,38 +116,40 @@ def make_info(design_context: DesignContext, width_mode: WidthMode):
         file.write('\n')
         file.write(f'Unicode 版本：{unidata_blocks.unicode_version}\n')
         file.write('\n')
-        _write_unicode_chr_count_infos_table(file, _get_unicode_chr_count_infos(alphabet))
+        _write_unicode_chr_count_infos_table(file, _get_unicode_chr_count_infos(coverage))
         file.write('\n')
         file.write('## GB2312 字符分布\n')
         file.write('\n')
         file.write('简体中文参考字符集。统计范围不包含 ASCII。\n')
         file.write('\n')
-        _write_locale_chr_count_infos_table(file, _get_gb2312_chr_count_infos(alphabet))
+        _write_locale_chr_count_infos_table(file, _get_gb2312_chr_count_infos(coverage))
         file.write('\n')
         file.write('## Big5 字符分布\n')
         file.write('\n')
         file.write('繁体中文参考字符集。统计范围不包含 ASCII。\n')
         file.write('\n')
-        _write_locale_chr_count_infos_table(file, _get_big5_chr_count_infos(alphabet))
+        _write_locale_chr_count_infos_table(file, _get_big5_chr_count_infos(coverage))
         file.write('\n')
         file.write('## Shift-JIS 字符分布\n')
         file.write('\n')
         file.write('日语参考字符集。\n')
         file.write('\n')
-        _write_locale_chr_count_infos_table(file, _get_shiftjis_chr_count_infos(alphabet))
+        _write_locale_chr_count_infos_table(file, _get_shiftjis_chr_count_infos(coverage))
         file.write('\n')
         file.write('## KS-X-1001 字符分布\n')
         file.write('\n')
         file.write('韩语参考字符集。统计范围不包含 ASCII。\n')
         file.write('\n')
-        _write_locale_chr_count_infos_table(file, _get_ksx1001_chr_count_infos(alphabet))
+        _write_locale_chr_count_infos_table(file, _get_ksx1001_chr_count_infos(coverage))
     logger.info("Make info: '{}'", file_path)
+    return file_path
 
 
-def make_alphabet_txt(design_context: DesignContext, width_mode: WidthMode):
+def make_alphabet_txt(design_context: DesignContext, width_mode: WidthMode) -> Path:
     alphabet = sorted(design_context.get_alphabet(width_mode))
 
     path_define.outputs_dir.mkdir(parents=True, exist_ok=True)
     file_path = path_define.outputs_dir.joinpath(f'alphabet-{design_context.font_size}px-{width_mode}.txt')
     file_path.write_text(''.join(alphabet), 'utf-8')
     logger.info("Make alphabet txt: '{}'", file_path)
+    return file_path
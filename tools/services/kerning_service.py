@@ -0,0 +1,85 @@
+from collections.abc import Iterable
+
+from pixel_font_knife.glyph_file_util import GlyphFlavorGroup
+from pixel_font_knife.kerning_util import KerningConfig
+
+from tools.utils import bitmask_util
+
+type KerningGlyph = tuple[str, int, list[int]]
+type KerningTemplate = tuple[list[KerningGlyph], list[KerningGlyph], int]
+
+
+def _get_mask_rows(width: int, rows: list[int]) -> list[int]:
+    full_bits = (1 << width) - 1
+    expanded_rows = [(row | (row << 1) | (row >> 1)) & full_bits for row in rows]
+    mask_rows = []
+    for y, expanded_row in enumerate(expanded_rows):
+        if y > 0:
+            expanded_row |= expanded_rows[y - 1]
+        if y < len(expanded_rows) - 1:
+            expanded_row |= expanded_rows[y + 1]
+        mask_rows.append(expanded_row)
+    return mask_rows
+
+
+def _is_overlapped(mask_rows: list[int], rows: list[int], x: int) -> bool:
+    for mask_row, row in zip(mask_rows, rows):
+        if x >= 0:
+            mask_row >>= x
+        else:
+            mask_row <<= -x
+        if mask_row & row != 0:
+            return True
+    return False
+
+
+def get_kerning_templates(kerning_config: KerningConfig, context: dict[int, GlyphFlavorGroup]) -> list[KerningTemplate]:
+    left_glyphs_cache = {}
+    right_glyphs_cache = {}
+
+    def get_glyphs(group_name: str, is_left: bool) -> list[KerningGlyph]:
+        glyphs_cache = left_glyphs_cache if is_left else right_glyphs_cache
+        if group_name in glyphs_cache:
+            return glyphs_cache[group_name]
+        glyphs = []
+        for c in kerning_config.groups[group_name]:
+            code_point = ord(c)
+            if code_point not in context:
+                continue
+            glyph_file = context[code_point].get_file()
+            bitmap = glyph_file.bitmap
+            rows = [bitmask_util.to_bits(bitmap_row) for bitmap_row in bitmap]
+            if is_left:
+                rows = _get_mask_rows(bitmap.width, rows)
+            glyphs.append((glyph_file.glyph_name, bitmap.width, rows))
+        glyphs_cache[group_name] = glyphs
+        return glyphs
+
+    templates = []
+    for (left_group_name, right_group_name), offset in kerning_config.templates.items():
+        if offset >= 0:
+            continue
+        templates.append((get_glyphs(left_group_name, True), get_glyphs(right_group_name, False), offset))
+    return templates
+
+
+def calculate_kerning_values(left_glyphs: list[KerningGlyph], right_glyphs: list[KerningGlyph], offset: int) -> dict[tuple[str, str], int]:
+    kerning_values = {}
+    for left_glyph_name, left_width, left_mask_rows in left_glyphs:
+        for right_glyph_name, _, right_rows in right_glyphs:
+            actual_offset = offset
+            while actual_offset < 0:
+                if not _is_overlapped(left_mask_rows, right_rows, left_width + actual_offset):
+                    break
+                actual_offset += 1
+
+            if actual_offset < 0:
+                kerning_values[(left_glyph_name, right_glyph_name)] = actual_offset
+    return kerning_values
+
+
+def merge_kerning_values(kerning_values_list: Iterable[dict[tuple[str, str], int]]) -> dict[tuple[str, str], int]:
+    kerning_values = {}
+    for template_kerning_values in kerning_values_list:
+        kerning_values.update(template_kerning_values)
+    return kerning_values
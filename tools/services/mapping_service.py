@@ -0,0 +1,61 @@
+from pixel_font_knife import glyph_mapping_util
+from pixel_font_knife.glyph_file_util import GlyphFlavorGroup
+from pixel_font_knife.glyph_mapping_util import SourceFlavorGroup
+
+from tools import configs
+from tools.services import cache_service
+
+type MappingSource = tuple[str | None, int, str | None]
+type MappingStage = list[tuple[int, tuple[MappingSource, ...]]]
+
+
+def compile_mapping_index(mappings: list[dict[int, SourceFlavorGroup]]) -> list[MappingStage]:
+    raw_stages = []
+    raw_stage = {}
+    for mapping in mappings:
+        if any(source_glyph.code_point in raw_stage for source_group in mapping.values() for source_glyph in source_group.values()):
+            raw_stages.append(raw_stage)
+            raw_stage = {}
+        for code_point, source_group in mapping.items():
+            sources = raw_stage.setdefault(code_point, [])
+            for flavor, source_glyph in source_group.items():
+                sources.append((flavor, source_glyph.code_point, source_glyph.flavor))
+    raw_stages.append(raw_stage)
+
+    mapping_index = []
+    for raw_stage in raw_stages:
+        stage = [(code_point, tuple(sources)) for code_point, sources in raw_stage.items() if len(sources) > 0]
+        stage.sort(key=lambda item: item[0])
+        if len(stage) > 0:
+            mapping_index.append(stage)
+    return mapping_index
+
+
+def load_mapping_index() -> list[MappingStage]:
+    mapping_index = cache_service.load_mapping_index()
+    if mapping_index is None:
+        mapping_index = compile_mapping_index([glyph_mapping_util.load_mapping(file_path) for file_path in configs.mapping_file_paths])
+        cache_service.save_mapping_index(mapping_index)
+    return mapping_index
+
+
+def apply_mapping_index(context: dict[int, GlyphFlavorGroup], mapping_index: list[MappingStage]):
+    for stage in mapping_index:
+        context_patch = {}
+        for code_point, sources in stage:
+            flavor_group = None
+            for flavor, source_code_point, source_flavor in sources:
+                if source_code_point not in context:
+                    continue
+                if flavor_group is None:
+                    flavor_group = GlyphFlavorGroup()
+                    context_patch[code_point] = flavor_group
+                flavor_group[flavor] = context[source_code_point].get_file(source_flavor)
+
+        for code_point, flavor_group in context_patch.items():
+            if code_point in context:
+                merged_flavor_group = GlyphFlavorGroup(context[code_point])
+                merged_flavor_group.update(flavor_group)
+                context[code_point] = merged_flavor_group
+            else:
+                context[code_point] = flavor_group
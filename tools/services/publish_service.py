@@ -1,23 +1,104 @@
 import re
 import zipfile
+from collections.abc import Iterator
+from contextlib import contextmanager, ExitStack
+from pathlib import Path
 
 from loguru import logger
 
 from tools import configs
 from tools.configs import path_define
 from tools.configs.options import FontSize, WidthMode, FontFormat
+from tools.utils import hash_util
 
 
-def make_release_zips(font_size: FontSize, width_mode: WidthMode, font_formats: list[FontFormat]):
-    path_define.releases_dir.mkdir(parents=True, exist_ok=True)
+def _get_compress_type(font_format: FontFormat) -> int:
+    if font_format.endswith('.woff') or font_format.endswith('.woff2'):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def _get_font_file_name(font_size: FontSize, width_mode: WidthMode, font_format: FontFormat) -> str:
+    return f'ark-pixel-inherited-{font_size}px-{width_mode}.{font_format}'
+
+
+@contextmanager
+def _create_zip(file_path: Path) -> Iterator[zipfile.ZipFile]:
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file_path = file_path.with_suffix(f'{file_path.suffix}.tmp')
+    try:
+        with zipfile.ZipFile(tmp_file_path, 'w') as file:
+            yield file
+        tmp_file_path.replace(file_path)
+    finally:
+        tmp_file_path.unlink(missing_ok=True)
+
+
+def _get_entry_date_time() -> tuple[int, int, int, int, int, int]:
+    year, month, day = (int(token) for token in configs.version.split('.'))
+    return year, month, day, 0, 0, 0
+
+
+def _write_entry(files: list[zipfile.ZipFile], file_path: Path, arcname: str, compress_type: int):
+    data = file_path.read_bytes()
+    for file in files:
+        zip_info = zipfile.ZipInfo(arcname, _get_entry_date_time())
+        zip_info.create_system = 3
+        zip_info.external_attr = 0o100644 << 16
+        zip_info.compress_type = compress_type
+        file.writestr(zip_info, data)
+
 
-    for font_format in font_formats:
-        file_path = path_define.releases_dir.joinpath(f'ark-pixel-font-inherited-{font_size}px-{width_mode}-{font_format}-v{configs.version}.zip')
-        with zipfile.ZipFile(file_path, 'w') as file:
-            file.write(path_define.project_root_dir.joinpath('LICENSE-OFL'), 'OFL.txt')
-            font_file_name = f'ark-pixel-inherited-{font_size}px-{width_mode}.{font_format}'
-            file.write(path_define.outputs_dir.joinpath(font_file_name), font_file_name)
-        logger.info("Make release zip: '{}'", file_path)
+def _get_release_zip_file_path(font_size: FontSize, width_mode: WidthMode, font_format: FontFormat) -> Path:
+    return path_define.releases_dir.joinpath(f'ark-pixel-font-inherited-{font_size}px-{width_mode}-{font_format}-v{configs.version}.zip')
+
+
+def _get_release_bundle_file_paths(font_sizes: list[FontSize]) -> dict[FontSize | None, Path]:
+    file_paths = {font_size: path_define.releases_dir.joinpath(f'ark-pixel-font-inherited-{font_size}px-v{configs.version}.zip') for font_size in font_sizes}
+    file_paths[None] = path_define.releases_dir.joinpath(f'ark-pixel-font-inherited-v{configs.version}.zip')
+    return file_paths
+
+
+def make_release_zip(font_size: FontSize, width_mode: WidthMode, font_format: FontFormat) -> Path:
+    file_path = _get_release_zip_file_path(font_size, width_mode, font_format)
+    with _create_zip(file_path) as file:
+        _write_entry([file], path_define.project_root_dir.joinpath('LICENSE-OFL'), 'OFL.txt', zipfile.ZIP_DEFLATED)
+        font_file_name = _get_font_file_name(font_size, width_mode, font_format)
+        _write_entry([file], path_define.outputs_dir.joinpath(font_file_name), font_file_name, _get_compress_type(font_format))
+    logger.info("Make release zip: '{}'", file_path)
+    return file_path
+
+
+def make_release_bundles(font_sizes: list[FontSize], width_modes: list[WidthMode], font_formats: list[FontFormat]) -> list[Path]:
+    file_paths = _get_release_bundle_file_paths(font_sizes)
+    with ExitStack() as stack:
+        files = {key: stack.enter_context(_create_zip(file_path)) for key, file_path in file_paths.items()}
+        _write_entry(list(files.values()), path_define.project_root_dir.joinpath('LICENSE-OFL'), 'OFL.txt', zipfile.ZIP_DEFLATED)
+        for font_size in font_sizes:
+            for width_mode in width_modes:
+                for font_format in font_formats:
+                    font_file_name = _get_font_file_name(font_size, width_mode, font_format)
+                    _write_entry([files[font_size], files[None]], path_define.outputs_dir.joinpath(font_file_name), font_file_name, _get_compress_type(font_format))
+    for file_path in file_paths.values():
+        logger.info("Make release bundle: '{}'", file_path)
+    return list(file_paths.values())
+
+
+def make_release_checksums(font_sizes: list[FontSize], width_modes: list[WidthMode], font_formats: list[FontFormat], release_bundles: bool = False) -> Path:
+    release_file_paths = [_get_release_zip_file_path(font_size, width_mode, font_format) for font_size in font_sizes for width_mode in width_modes for font_format in font_formats]
+    if release_bundles:
+        release_file_paths.extend(_get_release_bundle_file_paths(font_sizes).values())
+
+    path_define.releases_dir.mkdir(parents=True, exist_ok=True)
+    file_path = path_define.releases_dir.joinpath('SHA256SUMS')
+    lines = []
+    for release_file_path in sorted(release_file_paths, key=lambda x: x.name):
+        lines.append(f'{hash_util.hash_file(release_file_path)}  {release_file_path.name}\n')
+    tmp_file_path = file_path.with_suffix('.tmp')
+    tmp_file_path.write_text(''.join(lines), 'utf-8')
+    tmp_file_path.replace(file_path)
+    logger.info("Make release checksums: '{}'", file_path)
+    return file_path
 
 
 def update_docs():
@@ -1,11 +1,12 @@
 import json
 import shutil
 import zipfile
+from pathlib import PurePosixPath
 
 from loguru import logger
 
 from tools.configs import path_define
-from tools.utils import download_util
+from tools.utils import download_util, hash_util
 
 
 def setup_ark_pixel():
@@ -24,26 +25,39 @@ def setup_ark_pixel():
 
     downloads_dir = path_define.downloads_dir.joinpath('ark-pixel-font')
     source_file_path = downloads_dir.joinpath(f'{sha}.zip')
+    asset_sha256 = version_info.get('asset_sha256', None)
+    if source_file_path.exists() and asset_sha256 is not None and hash_util.hash_file(source_file_path) != asset_sha256:
+        logger.info("Checksum mismatch: '{}'", source_file_path)
+        source_file_path.unlink()
     if not source_file_path.exists():
         asset_url = version_info['asset_url']
         logger.info("Start download: '{}'", asset_url)
         downloads_dir.mkdir(parents=True, exist_ok=True)
-        download_util.download_file(asset_url, source_file_path)
+        download_util.download_file(asset_url, source_file_path, asset_sha256)
     else:
         logger.info("Already downloaded: '{}'", source_file_path)
 
     source_unzip_dir = downloads_dir.joinpath(f'ark-pixel-font-{sha}')
     if source_unzip_dir.exists():
         shutil.rmtree(source_unzip_dir)
+    glyphs_prefix = f'ark-pixel-font-{sha}/assets/glyphs/'
     with zipfile.ZipFile(source_file_path) as file:
-        file.extractall(downloads_dir)
+        for zip_info in file.infolist():
+            if zip_info.is_dir() or not zip_info.filename.startswith(glyphs_prefix):
+                continue
+            relative_path = PurePosixPath(zip_info.filename[len(glyphs_prefix):])
+            assert not relative_path.is_absolute() and '..' not in relative_path.parts, zip_info.filename
+            glyph_file_path = source_unzip_dir.joinpath(*relative_path.parts)
+            glyph_file_path.parent.mkdir(parents=True, exist_ok=True)
+            with file.open(zip_info) as file_from, glyph_file_path.open('wb') as file_to:
+                shutil.copyfileobj(file_from, file_to)
     logger.info("Unzip: '{}'", source_unzip_dir)
 
     if path_define.ark_pixel_glyphs_dir.exists():
         shutil.rmtree(path_define.ark_pixel_glyphs_dir)
-    source_unzip_dir.joinpath('assets', 'glyphs').rename(path_define.ark_pixel_glyphs_dir)
+    source_unzip_dir.rename(path_define.ark_pixel_glyphs_dir)
+    if path_define.ark_pixel_snapshots_dir.exists():
+        shutil.rmtree(path_define.ark_pixel_snapshots_dir)
 
-    if source_unzip_dir.exists():
-        shutil.rmtree(source_unzip_dir)
     cache_version_file_path.write_text(f'{json.dumps(version_info, indent=2, ensure_ascii=False)}\n', 'utf-8')
     logger.info("Setup glyphs: '{}'", sha)
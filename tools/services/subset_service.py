@@ -0,0 +1,24 @@
+from pathlib import Path
+
+from tools.services import coverage_service
+
+_BASE_ALPHABET = frozenset(chr(code_point) for code_point in range(0x20, 0x7F))
+
+
+def load_subset_alphabet(source: str) -> tuple[str, frozenset[str]]:
+    if source in coverage_service.charsets:
+        return source, _BASE_ALPHABET | frozenset(coverage_service.charsets[source].get_alphabet())
+    file_path = Path(source)
+    if file_path.is_file():
+        return file_path.stem, _BASE_ALPHABET | frozenset(c for c in file_path.read_text('utf-8') if c not in '\r\n')
+    raise Exception(f"Unknown subset: '{source}'")
+
+
+def load_subset_alphabets(sources: list[str]) -> dict[str, frozenset[str]]:
+    subset_alphabets = {}
+    for source in sources:
+        subset_name, alphabet = load_subset_alphabet(source)
+        if subset_name in subset_alphabets:
+            raise Exception(f"Duplicate subset name: '{subset_name}'")
+        subset_alphabets[subset_name] = alphabet
+    return subset_alphabets
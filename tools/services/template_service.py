@@ -1,113 +1,131 @@
-import bs4
-from jinja2 import Environment, FileSystemLoader
+import functools
+import gzip
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
 from loguru import logger
 
 from tools import configs
 from tools.configs import path_define, options
 from tools.configs.options import WidthMode
 from tools.services.font_service import DesignContext
+from tools.utils import html_util
+
+
+@functools.cache
+def _get_environment() -> Environment:
+    path_define.jinja_cache_dir.mkdir(parents=True, exist_ok=True)
+    return Environment(
+        trim_blocks=True,
+        lstrip_blocks=True,
+        loader=FileSystemLoader(path_define.templates_dir),
+        bytecode_cache=FileSystemBytecodeCache(path_define.jinja_cache_dir),
+        auto_reload=False,
+    )
 
-_environment = Environment(
-    trim_blocks=True,
-    lstrip_blocks=True,
-    loader=FileSystemLoader(path_define.templates_dir),
-)
 
+def clear_caches():
+    _get_environment.cache_clear()
+    _get_demo_content_tokens.cache_clear()
 
-def _make_html(template_name: str, file_name: str, params: dict[str, object] | None = None):
+
+def _make_html(template_name: str, file_name: str, params: dict[str, object] | None = None, webfonts: bool = False) -> Path:
     params = {} if params is None else dict(params)
     params['font_configs'] = configs.font_configs
     params['width_modes'] = options.width_modes
+    params['webfonts'] = webfonts
 
-    html = _environment.get_template(template_name).render(params)
+    html = _get_environment().get_template(template_name).render(params)
 
     path_define.outputs_dir.mkdir(parents=True, exist_ok=True)
     file_path = path_define.outputs_dir.joinpath(file_name)
     file_path.write_text(html, 'utf-8')
     logger.info("Make html: '{}'", file_path)
+    return file_path
+
 
+def make_alphabet_html(design_context: DesignContext, width_mode: WidthMode, alphabet_asset: bool = False, webfonts: bool = False) -> Path | list[Path]:
+    alphabet = ''.join(sorted(c for c in design_context.get_alphabet(width_mode) if ord(c) >= 128))
+    if not alphabet_asset:
+        return _make_html('alphabet.html', f'alphabet-{design_context.font_size}px-{width_mode}.html', {
+            'font_config': configs.font_configs[design_context.font_size],
+            'width_mode': width_mode,
+            'alphabet': alphabet,
+        }, webfonts)
 
-def make_alphabet_html(design_context: DesignContext, width_mode: WidthMode):
-    _make_html('alphabet.html', f'alphabet-{design_context.font_size}px-{width_mode}.html', {
+    path_define.outputs_dir.mkdir(parents=True, exist_ok=True)
+    asset_file_path = path_define.outputs_dir.joinpath(f'alphabet-{design_context.font_size}px-{width_mode}.txt.gz')
+    asset_file_path.write_bytes(gzip.compress(alphabet.encode('utf-8'), 9, mtime=0))
+    logger.info("Make alphabet asset: '{}'", asset_file_path)
+    html_file_path = _make_html('alphabet.html', f'alphabet-{design_context.font_size}px-{width_mode}.html', {
         'font_config': configs.font_configs[design_context.font_size],
         'width_mode': width_mode,
-        'alphabet': ''.join(sorted(c for c in design_context.get_alphabet(width_mode) if ord(c) >= 128)),
-    })
-
-
-def _handle_demo_html_element(design_context: DesignContext, soup: bs4.BeautifulSoup, element: bs4.PageElement):
-    if isinstance(element, bs4.element.Tag):
-        for child_element in list(element.contents):
-            _handle_demo_html_element(design_context, soup, child_element)
-    elif isinstance(element, bs4.element.NavigableString):
-        alphabet_monospaced = design_context.get_alphabet('monospaced')
-        alphabet_proportional = design_context.get_alphabet('proportional')
-        text = str(element)
-        tmp_parent = soup.new_tag('div')
-        last_status = None
-        text_buffer = ''
-        for c in text:
-            if c == ' ':
-                status = last_status
-            elif c == '\n':
-                status = 'all'
-            elif c in alphabet_monospaced and c in alphabet_proportional:
-                status = 'all'
-            elif c in alphabet_monospaced:
-                status = 'monospaced'
-            elif c in alphabet_proportional:
-                status = 'proportional'
-            else:
-                status = None
-            if last_status != status:
-                if text_buffer != '':
-                    if last_status == 'all':
-                        tmp_child = bs4.element.NavigableString(text_buffer)
-                    else:
-                        tmp_child = soup.new_tag('span')
-                        tmp_child.string = text_buffer
-                        if last_status == 'monospaced':
-                            tmp_child['class'] = f'char-notdef-proportional'
-                        elif last_status == 'proportional':
-                            tmp_child['class'] = f'char-notdef-monospaced'
-                        else:
-                            tmp_child['class'] = f'char-notdef-monospaced char-notdef-proportional'
-                    tmp_parent.append(tmp_child)
-                    text_buffer = ''
-                last_status = status
-            text_buffer += c
-        if text_buffer != '':
-            if last_status == 'all':
-                tmp_child = bs4.element.NavigableString(text_buffer)
-            else:
-                tmp_child = soup.new_tag('span')
-                tmp_child.string = text_buffer
-                if last_status == 'monospaced':
-                    tmp_child['class'] = f'char-notdef-proportional'
-                elif last_status == 'proportional':
-                    tmp_child['class'] = f'char-notdef-monospaced'
-                else:
-                    tmp_child['class'] = f'char-notdef-monospaced char-notdef-proportional'
-            tmp_parent.append(tmp_child)
-        element.replace_with(tmp_parent)
-        tmp_parent.unwrap()
-
-
-def make_demo_html(design_context: DesignContext):
-    content_html = path_define.templates_dir.joinpath('demo-content.html').read_text('utf-8')
-    soup = bs4.BeautifulSoup(content_html, 'html.parser')
-    _handle_demo_html_element(design_context, soup, soup)
-    content_html = str(soup).strip()
-
-    _make_html('demo.html', f'demo-{design_context.font_size}px.html', {
+        'alphabet_asset_name': asset_file_path.name,
+    }, webfonts)
+    return [html_file_path, asset_file_path]
+
+
+@functools.cache
+def _get_demo_content_tokens() -> list[tuple[bool, str]]:
+    return html_util.tokenize_html(path_define.templates_dir.joinpath('demo-content.html').read_text('utf-8'))
+
+
+def _create_demo_status_table(design_context: DesignContext) -> dict[str, str]:
+    alphabet_monospaced = design_context.get_alphabet('monospaced')
+    alphabet_proportional = design_context.get_alphabet('proportional')
+    status_table = dict.fromkeys(alphabet_monospaced, 'monospaced')
+    for c in alphabet_proportional:
+        status_table[c] = 'all' if c in alphabet_monospaced else 'proportional'
+    status_table['\n'] = 'all'
+    return status_table
+
+
+def _format_demo_text_run(text: str, status: str | None) -> str:
+    text = html_util.escape_text(text)
+    match status:
+        case 'all':
+            return text
+        case 'monospaced':
+            return f'<span class="char-notdef-proportional">{text}</span>'
+        case 'proportional':
+            return f'<span class="char-notdef-monospaced">{text}</span>'
+        case _:
+            return f'<span class="char-notdef-monospaced char-notdef-proportional">{text}</span>'
+
+
+def _annotate_demo_text(text: str, status_table: dict[str, str], parts: list[str]):
+    last_status = None
+    start = 0
+    for index, c in enumerate(text):
+        status = last_status if c == ' ' else status_table.get(c, None)
+        if status != last_status:
+            if index > start:
+                parts.append(_format_demo_text_run(text[start:index], last_status))
+                start = index
+            last_status = status
+    if len(text) > start:
+        parts.append(_format_demo_text_run(text[start:], last_status))
+
+
+def make_demo_html(design_context: DesignContext, webfonts: bool = False) -> Path:
+    status_table = _create_demo_status_table(design_context)
+    parts = []
+    for is_text, content in _get_demo_content_tokens():
+        if is_text:
+            _annotate_demo_text(content, status_table, parts)
+        else:
+            parts.append(content)
+    content_html = ''.join(parts).strip()
+
+    return _make_html('demo.html', f'demo-{design_context.font_size}px.html', {
         'font_config': configs.font_configs[design_context.font_size],
         'content_html': content_html,
-    })
+    }, webfonts)
 
 
-def make_index_html():
-    _make_html('index.html', 'index.html')
+def make_index_html(webfonts: bool = False) -> Path:
+    return _make_html('index.html', 'index.html', webfonts=webfonts)
 
 
-def make_playground_html():
-    _make_html('playground.html', 'playground.html')
+def make_playground_html(webfonts: bool = False) -> Path:
+    return _make_html('playground.html', 'playground.html', webfonts=webfonts)
@@ -3,7 +3,7 @@ import json
 from loguru import logger
 
 from tools.configs import path_define
-from tools.utils import github_api
+from tools.utils import github_api, download_util, hash_util
 
 
 def upgrade_ark_pixel():
@@ -28,11 +28,20 @@ def upgrade_ark_pixel():
         case _:
             raise Exception(f"Unknown source type: '{source_type}'")
 
+    asset_url = f'https://github.com/{repository_name}/archive/{sha}.zip'
+    downloads_dir = path_define.downloads_dir.joinpath('ark-pixel-font')
+    asset_file_path = downloads_dir.joinpath(f'{sha}.zip')
+    if not asset_file_path.exists():
+        logger.info("Start download: '{}'", asset_url)
+        downloads_dir.mkdir(parents=True, exist_ok=True)
+        download_util.download_file(asset_url, asset_file_path)
+
     version_info = {
         'sha': sha,
         'version': version,
         'version_url': f'https://github.com/{repository_name}/tree/{version}',
-        'asset_url': f'https://github.com/{repository_name}/archive/{sha}.zip',
+        'asset_url': asset_url,
+        'asset_sha256': hash_util.hash_file(asset_file_path),
     }
     version_file_path = path_define.assets_dir.joinpath('ark-pixel-version.json')
     version_file_path.write_text(f'{json.dumps(version_info, indent=2, ensure_ascii=False)}\n', 'utf-8')
@@ -0,0 +1,103 @@
+import functools
+import threading
+import time
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from pathlib import Path
+
+from loguru import logger
+
+from tools import configs
+from tools.configs import path_define
+from tools.configs.options import FontSize, WidthMode, FontFormat, Attachment, OutlinesEngine
+from tools.services import build_service, template_service, font_service, mapping_service, coverage_service
+
+_WATCH_DIRS = {
+    'mappings': path_define.mappings_dir,
+    'kernings': path_define.kernings_dir,
+    'configs': path_define.configs_dir,
+    'templates': path_define.templates_dir,
+}
+
+
+def _scan_files() -> dict[Path, tuple[str, int, int]]:
+    files = {}
+    for group_name, watch_dir in _WATCH_DIRS.items():
+        for file_path in watch_dir.rglob('*'):
+            if file_path.is_file():
+                stat = file_path.stat()
+                files[file_path] = group_name, stat.st_mtime_ns, stat.st_size
+    return files
+
+
+def _get_changed_groups(old_files: dict[Path, tuple[str, int, int]], new_files: dict[Path, tuple[str, int, int]]) -> set[str]:
+    changed_groups = set()
+    for file_path in old_files.keys() | new_files.keys():
+        if old_files.get(file_path, None) != new_files.get(file_path, None):
+            changed_groups.add((new_files.get(file_path, None) or old_files[file_path])[0])
+    return changed_groups
+
+
+def _start_server(port: int) -> ThreadingHTTPServer:
+    path_define.outputs_dir.mkdir(parents=True, exist_ok=True)
+    server = ThreadingHTTPServer(('127.0.0.1', port), functools.partial(SimpleHTTPRequestHandler, directory=str(path_define.outputs_dir)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info("Serve: 'http://127.0.0.1:{}/'", server.server_port)
+    return server
+
+
+def watch(
+        font_sizes: list[FontSize],
+        width_modes: list[WidthMode],
+        font_formats: list[FontFormat],
+        attachments: list[Attachment],
+        outlines_engine: OutlinesEngine = 'solid',
+        jobs: int = 1,
+        alphabet_asset: bool = False,
+        release_bundles: bool = False,
+        subsets: list[str] | None = None,
+        webfonts: bool = False,
+        interval: float = 0.5,
+        port: int | None = None,
+):
+    design_contexts = font_service.load_design_contexts(font_sizes, jobs)
+
+    def rebuild():
+        build_service.make_all(font_sizes, width_modes, font_formats, attachments, outlines_engine, jobs, False, alphabet_asset, release_bundles, None, subsets, webfonts, design_contexts)
+
+    rebuild()
+
+    server = None if port is None else _start_server(port)
+    files = _scan_files()
+    logger.info('Watching for changes')
+    try:
+        while True:
+            time.sleep(interval)
+            new_files = _scan_files()
+            changed_groups = _get_changed_groups(files, new_files)
+            files = new_files
+            if len(changed_groups) == 0:
+                continue
+            logger.info('Changed: {}', ', '.join(sorted(changed_groups)))
+
+            try:
+                if 'configs' in changed_groups:
+                    configs.invalidate('font_configs')
+                if 'templates' in changed_groups:
+                    template_service.clear_caches()
+                if 'kernings' in changed_groups:
+                    configs.invalidate('kerning_config')
+                    for design_context in design_contexts.values():
+                        design_context.clear_kerning_values()
+                if 'mappings' in changed_groups:
+                    mapping_index = mapping_service.load_mapping_index()
+                    for design_context in design_contexts.values():
+                        design_context.apply_mapping_index(mapping_index)
+                    coverage_service.clear_caches()
+                rebuild()
+            except Exception as e:
+                logger.error('Rebuild failed: {}', e)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.shutdown()
@@ -0,0 +1,72 @@
+from io import BytesIO
+from pathlib import Path
+
+import unidata_blocks
+from fontTools.ttLib import TTFont
+from loguru import logger
+from pixel_font_builder import opentype
+
+from tools.configs import path_define
+from tools.configs.options import WidthMode, OutlinesEngine
+from tools.services import font_service
+from tools.services.font_service import DesignContext
+
+_SHARD_MAX_CHARACTERS = 1000
+
+
+def _get_shards(code_points: list[int]) -> list[list[int]]:
+    shards = []
+    shard_block_start = None
+    for code_point in sorted(code_points):
+        block = unidata_blocks.get_block_by_code_point(code_point)
+        block_start = None if block is None else block.code_start
+        if len(shards) == 0 or block_start != shard_block_start or len(shards[-1]) >= _SHARD_MAX_CHARACTERS:
+            shards.append([])
+            shard_block_start = block_start
+        shards[-1].append(code_point)
+    return shards
+
+
+def _format_unicode_range(code_points: list[int]) -> str:
+    ranges = []
+    for code_point in code_points:
+        if len(ranges) > 0 and ranges[-1][1] == code_point - 1:
+            ranges[-1][1] = code_point
+        else:
+            ranges.append([code_point, code_point])
+    return ', '.join(f'U+{code_start:X}' if code_start == code_end else f'U+{code_start:X}-{code_end:X}' for code_start, code_end in ranges)
+
+
+def make_webfont(
+        design_context: DesignContext,
+        width_mode: WidthMode,
+        outlines_engine: OutlinesEngine = 'solid',
+        kerning_values: dict[tuple[str, str], int] | None = None,
+) -> list[Path]:
+    font_family = f'ark-pixel-inherited-{design_context.font_size}px-{width_mode}'
+    webfonts_dir = path_define.outputs_dir.joinpath('webfonts')
+    webfonts_dir.mkdir(parents=True, exist_ok=True)
+    for file_path in webfonts_dir.glob(f'{font_family}-*.woff2'):
+        file_path.unlink()
+
+    file_paths = []
+    css_rules = []
+    for index, shard in enumerate(_get_shards([ord(c) for c in design_context.get_alphabet(width_mode)])):
+        builder = design_context.create_builder(width_mode, outlines_engine, kerning_values, frozenset(map(chr, shard)))
+        font = TTFont(BytesIO(font_service.compile_opentype_font(builder, 'otf')), recalcBBoxes=False, recalcTimestamp=False)
+        font.flavor = opentype.Flavor.WOFF2
+        file_path = webfonts_dir.joinpath(f'{font_family}-{index:03}.woff2')
+        font.save(file_path)
+        file_paths.append(file_path)
+        css_rules.append(
+            '@font-face {\n'
+            f'    font-family: {font_family};\n'
+            f'    src: url("webfonts/{file_path.name}") format("woff2");\n'
+            f'    unicode-range: {_format_unicode_range(shard)};\n'
+            '}\n'
+        )
+
+    css_file_path = path_define.outputs_dir.joinpath(f'{font_family}.css')
+    css_file_path.write_text('\n'.join(css_rules), 'utf-8')
+    logger.info("Make webfont: '{}' ({} shards)", css_file_path, len(file_paths))
+    return [css_file_path, *file_paths]
@@ -0,0 +1,62 @@
+from pathlib import Path
+
+from pixel_font_knife.glyph_file_util import GlyphFile
+from pixel_font_knife.mono_bitmap import MonoBitmap
+
+
+class ArenaGlyphFile(GlyphFile):
+    _file_path: str
+    _arena: bytes
+    _offset: int
+    _width: int
+    _height: int
+
+    # noinspection PyMissingConstructor
+    def __init__(
+            self,
+            file_path: str,
+            code_point: int,
+            flavors: tuple[str, ...],
+            arena: bytes,
+            offset: int,
+            width: int,
+            height: int,
+    ):
+        self._file_path = file_path
+        self.code_point = code_point
+        self.flavors = flavors
+        self._arena = arena
+        self._offset = offset
+        self._width = width
+        self._height = height
+
+    @property
+    def file_path(self) -> Path:
+        return Path(self._file_path)
+
+    @file_path.setter
+    def file_path(self, value: Path):
+        self._file_path = str(value)
+
+    @property
+    def bitmap(self) -> MonoBitmap:
+        bitmap = MonoBitmap()
+        bitmap.width = self._width
+        bitmap.height = self._height
+        start = self._offset
+        for _ in range(self._height):
+            end = start + self._width
+            bitmap.append(list(self._arena[start:end]))
+            start = end
+        return bitmap
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def height(self) -> int:
+        return self._height
+
+    def save(self):
+        raise RuntimeError(f"arena glyph file is read-only: '{self._file_path}'")
@@ -0,0 +1,9 @@
+from collections.abc import Sequence
+
+_BITS_TABLE = bytes.maketrans(bytes(range(256)), b'0' + b'1' * 255)
+
+
+def to_bits(pixels: Sequence[int]) -> int:
+    if len(pixels) == 0:
+        return 0
+    return int(bytes(reversed(pixels)).translate(_BITS_TABLE), 2)
@@ -1,17 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import httpx
 from tqdm import tqdm
 
+from tools.utils import hash_util
 
-def download_file(url: str, file_path: Path):
-    with httpx.stream('GET', url, follow_redirects=True) as response:
+_PARALLEL_MIN_SIZE = 8 * 1024 * 1024
+
+
+def _fetch_range(client: httpx.Client, url: str, file_path: Path, start: int, end: int | None, progress: tqdm) -> bool:
+    offset = file_path.stat().st_size if file_path.is_file() else 0
+    if end is not None:
+        length = end - start + 1
+        if offset > length:
+            file_path.unlink()
+            offset = 0
+        elif offset == length:
+            progress.update(offset)
+            return True
+    headers = {}
+    if start + offset > 0 or end is not None:
+        headers['Range'] = f'bytes={start + offset}-{'' if end is None else end}'
+    with client.stream('GET', url, headers=headers) as response:
+        if response.status_code == 416 and end is None:
+            if response.headers.get('Content-Range', None) == f'bytes */{offset}':
+                progress.update(offset)
+                return True
+            file_path.unlink()
+            return _fetch_range(client, url, file_path, start, end, progress)
         assert response.is_success, url
-        tmp_file_path = file_path.with_suffix(f'{file_path.suffix}.download')
-        with tmp_file_path.open('wb') as file:
-            total = int(response.headers['Content-Length']) if 'Content-Length' in response.headers else 0
-            with tqdm(total=total) as progress:
-                for chunk in response.iter_bytes():
-                    file.write(chunk)
-                    progress.update(len(chunk))
-        tmp_file_path.rename(file_path)
+        if response.status_code == 206:
+            mode = 'ab'
+            progress.update(offset)
+        elif start > 0 or end is not None:
+            return False
+        else:
+            mode = 'wb'
+        if progress.total == 0 and 'Content-Length' in response.headers:
+            progress.total = int(response.headers['Content-Length']) + (offset if mode == 'ab' else 0)
+            progress.refresh()
+        with file_path.open(mode) as file:
+            for chunk in response.iter_bytes():
+                file.write(chunk)
+                progress.update(len(chunk))
+    return response.status_code == 206
+
+
+def _get_range_total(client: httpx.Client, url: str) -> int | None:
+    response = client.head(url)
+    if not response.is_success or response.headers.get('Accept-Ranges', None) != 'bytes' or 'Content-Length' not in response.headers:
+        return None
+    return int(response.headers['Content-Length'])
+
+
+def _fetch_parts(client: httpx.Client, url: str, file_path: Path, total: int, jobs: int) -> bool:
+    chunk_size = -(-total // jobs)
+    part_ranges = [(start, min(start + chunk_size, total) - 1) for start in range(0, total, chunk_size)]
+    part_file_paths = [file_path.with_suffix(f'{file_path.suffix}.part{start}-{end}') for start, end in part_ranges]
+    with tqdm(total=total, unit='B', unit_scale=True) as progress:
+        with ThreadPoolExecutor(len(part_ranges)) as executor:
+            supported = all(list(executor.map(lambda args: _fetch_range(client, url, *args, progress), [(part_file_path, start, end) for part_file_path, (start, end) in zip(part_file_paths, part_ranges)])))
+    if supported:
+        with file_path.open('wb') as file:
+            for part_file_path in part_file_paths:
+                with part_file_path.open('rb') as part_file:
+                    while chunk := part_file.read(1024 * 1024):
+                        file.write(chunk)
+    for part_file_path in file_path.parent.glob(f'{file_path.name}.part*'):
+        part_file_path.unlink()
+    return supported
+
+
+def download_file(url: str, file_path: Path, sha256: str | None = None, jobs: int = 4):
+    tmp_file_path = file_path.with_suffix(f'{file_path.suffix}.download')
+    with httpx.Client(follow_redirects=True) as client:
+        total = _get_range_total(client, url) if jobs > 1 else None
+        if total is None or total < _PARALLEL_MIN_SIZE or not _fetch_parts(client, url, tmp_file_path, total, jobs):
+            with tqdm(total=total or 0, unit='B', unit_scale=True) as progress:
+                _fetch_range(client, url, tmp_file_path, 0, None, progress)
+
+    if sha256 is not None:
+        actual_sha256 = hash_util.hash_file(tmp_file_path)
+        if actual_sha256 != sha256:
+            tmp_file_path.unlink()
+            raise Exception(f"Checksum mismatch: '{url}' expected {sha256}, got {actual_sha256}")
+    tmp_file_path.replace(file_path)
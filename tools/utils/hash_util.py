@@ -0,0 +1,20 @@
+import hashlib
+from collections.abc import Iterable
+from pathlib import Path
+
+
+def hash_values(values: Iterable[object]) -> str:
+    hasher = hashlib.sha256()
+    for value in values:
+        if isinstance(value, Path):
+            value = value.read_bytes()
+        elif not isinstance(value, bytes):
+            value = repr(value).encode('utf-8')
+        hasher.update(len(value).to_bytes(8))
+        hasher.update(value)
+    return hasher.hexdigest()
+
+
+def hash_file(file_path: Path) -> str:
+    with file_path.open('rb') as file:
+        return hashlib.file_digest(file, 'sha256').hexdigest()
@@ -0,0 +1,108 @@
+from html.parser import HTMLParser
+
+_VOID_ELEMENTS = {
+    'area',
+    'base',
+    'br',
+    'col',
+    'embed',
+    'hr',
+    'img',
+    'input',
+    'link',
+    'meta',
+    'param',
+    'source',
+    'track',
+    'wbr',
+}
+
+
+def escape_text(text: str) -> str:
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _quote_attribute_value(value: str) -> str:
+    value = value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    if '"' in value:
+        if "'" in value:
+            return f'"{value.replace('"', '&quot;')}"'
+        return f"'{value}'"
+    return f'"{value}"'
+
+
+_PRESERVE_WHITESPACE_ELEMENTS = {
+    'pre',
+    'textarea',
+}
+
+
+class _HtmlTokenizer(HTMLParser):
+    tokens: list[tuple[bool, str]]
+    _text_buffer: list[str]
+    _preserve_whitespace_depth: int
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tokens = []
+        self._text_buffer = []
+        self._preserve_whitespace_depth = 0
+
+    def flush_text(self):
+        if len(self._text_buffer) == 0:
+            return
+        text = ''.join(self._text_buffer)
+        self._text_buffer.clear()
+        if self._preserve_whitespace_depth == 0 and text.strip() == '':
+            text = '\n' if '\n' in text else ' '
+        self.tokens.append((True, text))
+
+    def _append_markup(self, markup: str):
+        self.flush_text()
+        if len(self.tokens) > 0 and not self.tokens[-1][0]:
+            self.tokens[-1] = False, self.tokens[-1][1] + markup
+        else:
+            self.tokens.append((False, markup))
+
+    @staticmethod
+    def _format_start_tag(tag: str, attrs: list[tuple[str, str | None]]) -> str:
+        tokens = [tag]
+        for name, value in attrs:
+            tokens.append(f'{name}={_quote_attribute_value('' if value is None else value)}')
+        if tag in _VOID_ELEMENTS:
+            return f'<{' '.join(tokens)}/>'
+        return f'<{' '.join(tokens)}>'
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]):
+        self._append_markup(self._format_start_tag(tag, attrs))
+        if tag in _PRESERVE_WHITESPACE_ELEMENTS:
+            self._preserve_whitespace_depth += 1
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]):
+        markup = self._format_start_tag(tag, attrs)
+        if tag not in _VOID_ELEMENTS:
+            markup = f'{markup}</{tag}>'
+        self._append_markup(markup)
+
+    def handle_endtag(self, tag: str):
+        if tag not in _VOID_ELEMENTS:
+            self._append_markup(f'</{tag}>')
+        if tag in _PRESERVE_WHITESPACE_ELEMENTS and self._preserve_whitespace_depth > 0:
+            self._preserve_whitespace_depth -= 1
+
+    def handle_data(self, data: str):
+        self._text_buffer.append(data)
+
+    def handle_comment(self, data: str):
+        self._append_markup(f'<!--{data}-->')
+
+    def handle_decl(self, decl: str):
+        self._append_markup(f'<!{decl}>')
+
+
+def tokenize_html(html: str) -> list[tuple[bool, str]]:
+    tokenizer = _HtmlTokenizer()
+    tokenizer.feed(html)
+    tokenizer.close()
+    tokenizer.flush_text()
+    return tokenizer.tokens
@@ -0,0 +1,44 @@
+import os
+import sys
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def get_memory_usage() -> int | None:
+    try:
+        return int(Path('/proc/self/statm').read_bytes().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+def reset_peak_memory_usage() -> bool:
+    try:
+        Path('/proc/self/clear_refs').write_text('5')
+        return True
+    except OSError:
+        return False
+
+
+def get_peak_memory_usage() -> int | None:
+    try:
+        for line in Path('/proc/self/status').read_text('utf-8').splitlines():
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return max_rss
+    return max_rss * 1024
+
+
+def format_memory_size(size: int | None) -> str:
+    if size is None:
+        return 'unknown'
+    return f'{size / 1024 / 1024:.1f} MiB'
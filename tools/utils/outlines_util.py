@@ -0,0 +1,120 @@
+from io import BytesIO
+
+from fontTools.pens.recordingPen import RecordingPen
+from fontTools.ttLib import TTFont
+from pixel_font_builder.opentype import SolidOutlinesPainter
+
+from tools.utils import bitmask_util
+
+_RIGHT_TURN_ORDERS = {
+    (1, 0): [(0, 1), (1, 0), (0, -1)],
+    (0, 1): [(-1, 0), (0, 1), (1, 0)],
+    (-1, 0): [(0, -1), (-1, 0), (0, 1)],
+    (0, -1): [(1, 0), (0, -1), (-1, 0)],
+}
+
+
+def _get_direction(start: tuple[int, int], end: tuple[int, int]) -> tuple[int, int]:
+    return (end[0] > start[0]) - (end[0] < start[0]), (end[1] > start[1]) - (end[1] < start[1])
+
+
+class BitmaskOutlinesPainter(SolidOutlinesPainter):
+    @staticmethod
+    def _create_outlines(bitmap: list[list[int]]) -> list[list[tuple[int, int]]]:
+        rows = [bitmask_util.to_bits(bitmap_row) for bitmap_row in bitmap]
+        columns = [bitmask_util.to_bits(bitmap_column) for bitmap_column in zip(*bitmap)]
+
+        edges = {}
+
+        def add_edge(start: tuple[int, int], end: tuple[int, int]):
+            if start in edges:
+                edges[start].append(end)
+            else:
+                edges[start] = [end]
+
+        for y, row in enumerate(rows):
+            above = rows[y - 1] if y > 0 else 0
+            below = rows[y + 1] if y < len(rows) - 1 else 0
+            for mask, edge_y, is_reversed in ((row & ~above, y, False), (row & ~below, y + 1, True)):
+                while mask != 0:
+                    bit = mask & -mask
+                    run = (mask + bit) & ~mask
+                    mask ^= run - bit
+                    start = bit.bit_length() - 1, edge_y
+                    end = run.bit_length() - 1, edge_y
+                    if is_reversed:
+                        start, end = end, start
+                    add_edge(start, end)
+
+        for x, column in enumerate(columns):
+            left = columns[x - 1] if x > 0 else 0
+            right = columns[x + 1] if x < len(columns) - 1 else 0
+            for mask, edge_x, is_reversed in ((column & ~left, x, True), (column & ~right, x + 1, False)):
+                while mask != 0:
+                    bit = mask & -mask
+                    run = (mask + bit) & ~mask
+                    mask ^= run - bit
+                    start = edge_x, bit.bit_length() - 1
+                    end = edge_x, run.bit_length() - 1
+                    if is_reversed:
+                        start, end = end, start
+                    add_edge(start, end)
+
+        outlines = []
+        for start in sorted(edges, key=lambda point: (point[1], point[0])):
+            if start not in edges:
+                continue
+            points = [start]
+            point = start
+            direction = None
+            while True:
+                ends = edges[point]
+                if len(ends) == 1 or direction is None:
+                    end = ends.pop(0)
+                else:
+                    end_directions = [_get_direction(point, end) for end in ends]
+                    for turn in _RIGHT_TURN_ORDERS[direction]:
+                        if turn in end_directions:
+                            end = ends.pop(end_directions.index(turn))
+                            break
+                if len(ends) == 0:
+                    del edges[point]
+                direction = _get_direction(point, end)
+                if end == start:
+                    break
+                points.append(end)
+                point = end
+
+            outline = []
+            for index, (x, y) in enumerate(points):
+                xl, yl = points[index - 1]
+                xr, yr = points[(index + 1) % len(points)]
+                if (x == xl and x == xr) or (y == yl and y == yr):
+                    continue
+                outline.append((x, y))
+            outlines.append(outline)
+        return outlines
+
+
+def get_font_outlines(data: bytes) -> dict[str, list[tuple[tuple[float, float], ...]]]:
+    font = TTFont(BytesIO(data))
+    glyph_set = font.getGlyphSet()
+    font_outlines = {}
+    for glyph_name in font.getGlyphOrder():
+        pen = RecordingPen()
+        glyph_set[glyph_name].draw(pen)
+        outlines = []
+        points = []
+        for operator, operands in pen.value:
+            match operator:
+                case 'moveTo' | 'lineTo':
+                    points.append(operands[0])
+                case 'closePath' | 'endPath':
+                    index = points.index(min(points))
+                    outlines.append(tuple(points[index:] + points[:index]))
+                    points = []
+                case _:
+                    raise Exception(f"Unsupported outlines operator: '{operator}'")
+        outlines.sort()
+        font_outlines[glyph_name] = outlines
+    return font_outlines
@@ -0,0 +1,138 @@
+from collections.abc import Callable, Hashable, Iterable
+from concurrent.futures import Future, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any
+
+from tools.utils import trace_util
+from tools.utils.trace_util import TraceSpan
+
+
+class TaskRef:
+    key: Hashable
+
+    def __init__(self, key: Hashable):
+        self.key = key
+
+
+class Task:
+    key: Hashable
+    func: Callable[..., Any]
+    args: tuple[Any, ...]
+    dependencies: list[Hashable]
+
+    def __init__(
+            self,
+            key: Hashable,
+            func: Callable[..., Any],
+            args: tuple[Any, ...],
+            dependencies: list[Hashable],
+    ):
+        self.key = key
+        self.func = func
+        self.args = args
+        self.dependencies = dependencies
+
+
+class TaskGraph:
+    _tasks: dict[Hashable, Task]
+
+    def __init__(self):
+        self._tasks = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._tasks
+
+    def add(
+            self,
+            key: Hashable,
+            func: Callable[..., Any],
+            *args: Any,
+            after: Iterable[Hashable] = (),
+    ) -> TaskRef:
+        if key in self._tasks:
+            raise KeyError(f'duplicate task: {repr(key)}')
+
+        dependencies = []
+        for dependency in [arg.key for arg in args if isinstance(arg, TaskRef)] + list(after):
+            if dependency not in self._tasks:
+                raise KeyError(f'unknown dependency: {repr(dependency)}')
+            if dependency not in dependencies:
+                dependencies.append(dependency)
+
+        self._tasks[key] = Task(key, func, args, dependencies)
+        return TaskRef(key)
+
+    def run(
+            self,
+            jobs: int = 1,
+            on_task_done: Callable[[Hashable, Any], None] | None = None,
+            on_task_traced: Callable[[Hashable, Any, TraceSpan], None] | None = None,
+    ) -> dict[Hashable, Any]:
+        dependents_counts = {key: 0 for key in self._tasks}
+        for task in self._tasks.values():
+            for dependency in task.dependencies:
+                dependents_counts[dependency] += 1
+        results = {}
+        sink_results = {}
+
+        def resolve_args(task: Task) -> tuple[Any, ...]:
+            return tuple(results[arg.key] if isinstance(arg, TaskRef) else arg for arg in task.args)
+
+        def get_call(task: Task) -> tuple[Callable[..., Any], tuple[Any, ...]]:
+            if on_task_traced is None:
+                return task.func, resolve_args(task)
+            return trace_util.call_traced, (task.func, *resolve_args(task))
+
+        def finish(task: Task, result: Any):
+            if on_task_traced is not None:
+                result, span = result
+                on_task_traced(task.key, result, span)
+            task.args = ()
+            if dependents_counts[task.key] > 0:
+                results[task.key] = result
+            else:
+                sink_results[task.key] = result
+            for dependency in task.dependencies:
+                dependents_counts[dependency] -= 1
+                if dependents_counts[dependency] == 0:
+                    results.pop(dependency, None)
+            if on_task_done is not None:
+                on_task_done(task.key, result)
+
+        if jobs <= 1:
+            for task in self._tasks.values():
+                func, args = get_call(task)
+                finish(task, func(*args))
+            return {key: sink_results[key] for key in self._tasks if key in sink_results}
+
+        waiting_counts = {key: len(task.dependencies) for key, task in self._tasks.items()}
+        dependents = {key: [] for key in self._tasks}
+        for task in self._tasks.values():
+            for dependency in task.dependencies:
+                dependents[dependency].append(task.key)
+
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        try:
+            futures: dict[Future, Task] = {}
+
+            def submit(task: Task):
+                func, args = get_call(task)
+                futures[executor.submit(func, *args)] = task
+
+            for key, waiting_count in waiting_counts.items():
+                if waiting_count == 0:
+                    submit(self._tasks[key])
+
+            while len(futures) > 0:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = futures.pop(future)
+                    finish(task, future.result())
+                    for dependent in dependents[task.key]:
+                        waiting_counts[dependent] -= 1
+                        if waiting_counts[dependent] == 0:
+                            submit(self._tasks[dependent])
+        except BaseException:
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+        executor.shutdown()
+        return {key: sink_results[key] for key in self._tasks if key in sink_results}
@@ -0,0 +1,138 @@
+import json
+import os
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from tools.utils import memory_util
+
+
+class TraceSpan:
+    @staticmethod
+    def start() -> TraceSpan:
+        is_peak_memory_reset = memory_util.reset_peak_memory_usage()
+        return TraceSpan(
+            os.getpid(),
+            time.time_ns(),
+            time.perf_counter_ns(),
+            time.process_time_ns(),
+            memory_util.get_memory_usage(),
+            is_peak_memory_reset,
+        )
+
+    name: str
+    category: str
+    pid: int
+    start_time: int
+    wall_time: int
+    cpu_time: int
+    start_memory: int | None
+    is_peak_memory_reset: bool
+    peak_memory: int | None
+    peak_memory_delta: int | None
+    counters: dict[str, int]
+
+    def __init__(
+            self,
+            pid: int,
+            start_time: int,
+            wall_time: int,
+            cpu_time: int,
+            start_memory: int | None,
+            is_peak_memory_reset: bool,
+    ):
+        self.name = ''
+        self.category = ''
+        self.pid = pid
+        self.start_time = start_time
+        self.wall_time = wall_time
+        self.cpu_time = cpu_time
+        self.start_memory = start_memory
+        self.is_peak_memory_reset = is_peak_memory_reset
+        self.peak_memory = None
+        self.peak_memory_delta = None
+        self.counters = {}
+
+    def stop(self):
+        self.wall_time = time.perf_counter_ns() - self.wall_time
+        self.cpu_time = time.process_time_ns() - self.cpu_time
+        if self.is_peak_memory_reset:
+            self.peak_memory = memory_util.get_peak_memory_usage()
+        else:
+            self.peak_memory = memory_util.get_memory_usage()
+        if self.peak_memory is not None and self.start_memory is not None:
+            self.peak_memory_delta = max(self.peak_memory - self.start_memory, 0)
+
+
+def call_traced(func: Callable[..., Any], *args: Any) -> tuple[Any, TraceSpan]:
+    span = TraceSpan.start()
+    result = func(*args)
+    span.stop()
+    return result, span
+
+
+class Tracer:
+    start_time: int
+    spans: list[TraceSpan]
+
+    def __init__(self):
+        self.start_time = time.time_ns()
+        self.spans = []
+
+    def add(self, name: str, category: str, span: TraceSpan, counters: dict[str, int] | None = None):
+        span.name = name
+        span.category = category
+        if counters is not None:
+            span.counters.update(counters)
+        self.spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, category: str) -> Iterator[None]:
+        span = TraceSpan.start()
+        try:
+            yield
+        finally:
+            span.stop()
+            self.add(name, category, span)
+
+    def save(self, file_path: Path):
+        events = []
+        for span in self.spans:
+            args = {
+                'cpu_ms': round(span.cpu_time / 1_000_000, 3),
+                'peak_memory': span.peak_memory,
+                'peak_memory_delta': span.peak_memory_delta,
+            }
+            args.update(span.counters)
+            events.append({
+                'name': span.name,
+                'cat': span.category,
+                'ph': 'X',
+                'pid': span.pid,
+                'tid': 0,
+                'ts': (span.start_time - self.start_time) / 1000,
+                'dur': span.wall_time / 1000,
+                'args': args,
+            })
+        for pid in sorted({span.pid for span in self.spans}):
+            events.append({
+                'name': 'process_name',
+                'ph': 'M',
+                'pid': pid,
+                'args': {'name': 'main' if pid == os.getpid() else f'worker {pid}'},
+            })
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'}, ensure_ascii=False), 'utf-8')
+
+    def get_summary(self) -> list[tuple[str, int, float, float, int | None, dict[str, int]]]:
+        summary = {}
+        for span in self.spans:
+            count, wall_time, cpu_time, peak_memory_delta, counters = summary.get(span.category, (0, 0, 0, None, {}))
+            if span.peak_memory_delta is not None:
+                peak_memory_delta = max(peak_memory_delta or 0, span.peak_memory_delta)
+            for counter_name, value in span.counters.items():
+                counters[counter_name] = counters.get(counter_name, 0) + value
+            summary[span.category] = count + 1, wall_time + span.wall_time, cpu_time + span.cpu_time, peak_memory_delta, counters
+        return [(category, count, wall_time / 1_000_000_000, cpu_time / 1_000_000_000, peak_memory_delta, counters) for category, (count, wall_time, cpu_time, peak_memory_delta, counters) in summary.items()]
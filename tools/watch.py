@@ -0,0 +1,53 @@
+from typing import Literal
+
+from cyclopts import App, Parameter
+
+from tools.configs import options
+from tools.configs.options import FontSize, WidthMode, FontFormat, Attachment, OutlinesEngine
+
+app = App(default_parameter=Parameter(consume_multiple=True))
+
+
+@app.default
+def main(
+        font_sizes: set[FontSize] | None = None,
+        width_modes: set[WidthMode] | None = None,
+        font_formats: set[FontFormat] | None = None,
+        attachments: set[Attachment | Literal['all']] | None = None,
+        outlines_engine: OutlinesEngine = 'solid',
+        jobs: int = 1,
+        alphabet_asset: bool = False,
+        release_bundles: bool = False,
+        subsets: list[str] | None = None,
+        webfonts: bool = False,
+        interval: float = 0.5,
+        port: int | None = None,
+):
+    if font_sizes is None:
+        font_sizes = options.font_sizes
+    else:
+        font_sizes = sorted(font_sizes, key=lambda x: options.font_sizes.index(x))
+    if width_modes is None:
+        width_modes = options.width_modes
+    else:
+        width_modes = sorted(width_modes, key=lambda x: options.width_modes.index(x))
+    if font_formats is None:
+        font_formats = options.font_formats
+    else:
+        font_formats = sorted(font_formats, key=lambda x: options.font_formats.index(x))
+    if attachments is None:
+        attachments = []
+    elif 'all' in attachments:
+        attachments = options.attachments
+    else:
+        attachments = sorted(attachments, key=lambda x: options.attachments.index(x))
+
+    from tools.services import setup_service, watch_service
+
+    setup_service.setup_ark_pixel()
+
+    watch_service.watch(font_sizes, width_modes, font_formats, attachments, outlines_engine, jobs, alphabet_asset, release_bundles, subsets, webfonts, interval, port)
+
+
+if __name__ == '__main__':
+    app()